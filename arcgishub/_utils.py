@@ -0,0 +1,489 @@
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import OrderedDict
+from collections.abc import Mapping
+import heapq
+import json
+import threading
+import time
+
+_MAX_WORKERS = 8
+
+#Number of item ids resolved in a single portal search query
+_ITEM_IDS_PER_QUERY = 50
+
+#Number of items shared in a single share request
+_ITEMS_PER_SHARE = 100
+
+#Number of hostnames, and for how many seconds, get_by_domain remembers the site of
+_DOMAIN_CACHE_SIZE = 1024
+_DOMAIN_CACHE_TTL = 300
+
+def _run_concurrently(fn, elements, max_workers=_MAX_WORKERS):
+    '''
+    Calls `fn` on every element through a bounded thread pool.
+    Returns a list of (element, result, error) tuples in input order, where
+    error is the exception raised by `fn` or None.
+    '''
+    elements = list(elements)
+    if not elements:
+        return []
+
+    def _call(element):
+        try:
+            return element, fn(element), None
+        except Exception as e:
+            return element, None, e
+
+    max_workers = max(1, min(max_workers, len(elements)))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        return list(executor.map(_call, elements))
+
+def _iter_concurrently(fn, elements, max_workers=_MAX_WORKERS):
+    '''
+    Calls `fn` on every element through a bounded thread pool and yields
+    (element, result, error) tuples as the calls complete, where error is
+    the exception raised by `fn` or None.
+    '''
+    elements = list(elements)
+    if not elements:
+        return
+    max_workers = max(1, min(max_workers, len(elements)))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = {executor.submit(fn, element): element for element in elements}
+        try:
+            for future in as_completed(futures):
+                try:
+                    yield futures[future], future.result(), None
+                except Exception as e:
+                    yield futures[future], None, e
+        finally:
+            # stop pending calls if the caller stops consuming early
+            for future in futures:
+                future.cancel()
+
+class _TTLCache(object):
+    '''
+    Thread safe mapping of at most `maxsize` entries, each expiring `ttl`
+    seconds after it was set. The least recently used entry is evicted
+    first when the cache is full.
+    '''
+    def __init__(self, maxsize=_DOMAIN_CACHE_SIZE, ttl=_DOMAIN_CACHE_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._entries)
+
+    def get(self, key):
+        '''
+        Returns the value of an unexpired entry, or None.
+        '''
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def discard(self, predicate):
+        '''
+        Drops the entries whose value matches `predicate`.
+        '''
+        with self._lock:
+            for key in [key for key, (_, value) in self._entries.items() if predicate(value)]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+_domain_cache_lock = threading.Lock()
+
+def _domain_cache(gis):
+    '''
+    Returns the cache of hostname to (siteId, site item) of a GIS, shared by
+    all its site managers.
+    '''
+    with _domain_cache_lock:
+        cache = getattr(gis, '_hub_domains', None)
+        if cache is None:
+            cache = gis._hub_domains = _TTLCache()
+        return cache
+
+def _forget_site_domains(gis, siteid):
+    '''
+    Drops the cached hostnames of a site, e.g. when its domain records or
+    its item change.
+    '''
+    cache = getattr(gis, '_hub_domains', None)
+    if cache is not None:
+        cache.discard(lambda value: value[0] == siteid)
+
+def _active_batch(gis):
+    '''
+    Returns the Batch open on a GIS, or None outside of `hub.batch()`.
+    '''
+    return getattr(gis, '_hub_batch', None)
+
+def _pending_definition(obj):
+    '''
+    Returns the definition of a Site or Page item edited in the open batch
+    but not written yet, or None.
+    '''
+    batch = _active_batch(obj._gis)
+    if batch is None:
+        return None
+    return batch._pending_definition(obj.itemid)
+
+def _fingerprint(definition):
+    '''
+    Returns a dictionary of path to digest for a Site or Page definition, down
+    to the second level of keys (e.g. `values.layout`, `catalog.groups`).
+    '''
+    digests = {}
+    if definition is None:
+        return digests
+    for key, value in definition.items():
+        if isinstance(value, Mapping) and value:
+            for subkey, subvalue in value.items():
+                digests['%s.%s' % (key, subkey)] = hash(json.dumps(subvalue, sort_keys=True, default=str))
+        else:
+            digests[key] = hash(json.dumps(value, sort_keys=True, default=str))
+    return digests
+
+def _changed_paths(baseline, definition):
+    '''
+    Returns the sorted paths of a definition that differ from its baseline
+    fingerprint. Every path is changed when there is no baseline.
+    '''
+    current = _fingerprint(definition)
+    if baseline is None:
+        return sorted(current)
+    return sorted(path for path in set(baseline) | set(current) if baseline.get(path) != current.get(path))
+
+def _loaded_property(item, key, default=None):
+    '''
+    Returns a property already loaded on an item, without the hydration
+    request that attribute access on an unhydrated Item makes.
+    '''
+    if isinstance(item, dict) and dict.__contains__(item, key):
+        return dict.__getitem__(item, key)
+    return vars(item).get(key, default)
+
+def _changed_properties(item, properties):
+    '''
+    Returns the item properties that differ from the values already loaded
+    on the item. Properties that are not loaded are treated as changed,
+    rather than hydrating the item to read them.
+    '''
+    missing = object()
+    return {key: value for key, value in dict(properties or {}).items()
+            if _loaded_property(item, key, missing) != value}
+
+def _save_definition(obj, item_properties=None):
+    '''
+    Writes the definition of a Site or Page to its item if it changed since it
+    was fetched or last written, along with the optional item properties, and
+    records the changed paths in `obj.updated_paths`. Returns True without a
+    request if nothing changed.
+    '''
+    paths = obj.changed_paths if obj._definition_loaded else []
+    obj.updated_paths = paths
+    item_properties = dict(item_properties or {})
+    if paths:
+        item_properties['text'] = obj.definition
+    if not item_properties:
+        return True
+    status = obj.item.update(item_properties=item_properties)
+    if status and paths:
+        obj._baseline = _fingerprint(obj.definition)
+    return status
+
+def _write_definition(obj):
+    '''
+    Writes the definition of a Site or Page to its item, if it changed. Within
+    `hub.batch()` the write is recorded and made once per item when the batch
+    exits.
+    '''
+    batch = _active_batch(obj._gis)
+    if batch is not None:
+        batch._record(obj)
+        return True
+    return _save_definition(obj)
+
+def _prefetch_definitions(objects, max_workers=_MAX_WORKERS):
+    '''
+    Fetches the item data for a list of Site, Page or Initiative objects
+    concurrently and fills in their lazily-loaded definitions. The error
+    of every object is kept in its `definition_error`, None on success.
+    Returns a dictionary of itemid to the exception raised for every item
+    whose data could not be fetched.
+    '''
+    errors = {}
+    pending = []
+    for obj in objects:
+        if obj._definition_loaded:
+            continue
+        #items already edited in the open batch are not fetched again
+        definition = _pending_definition(obj)
+        if definition is not None:
+            obj.definition = definition
+        else:
+            pending.append(obj)
+    results = _run_concurrently(lambda obj: obj.item.get_data(), pending, max_workers)
+    for obj, data, error in results:
+        if error is None:
+            try:
+                obj._set_definition(data)
+            except Exception as e:
+                error = e
+        obj.definition_error = error
+        if error is not None:
+            obj.definition = None
+            errors[obj.itemid] = error
+    return errors
+
+def _search_pages(gis, query, page_size=100, sort_field=None, sort_order=None):
+    '''
+    Pages through the portal search results for a query with start/num
+    cursors, yielding the items of each page as it arrives. The portal
+    returns at most 100 items per page, and no results past the first
+    10,000 of a query.
+    '''
+    num = max(1, min(page_size, 100))
+    params = {}
+    if sort_field:
+        params['sort_field'] = sort_field
+    if sort_order:
+        params['sort_order'] = sort_order
+    start = 1
+    while start > 0:
+        response = gis.content.advanced_search(query=query, start=start, max_items=num, **params)
+        items = response.get('results', [])
+        if not items:
+            break
+        yield items
+        start = response.get('nextStart', -1)
+
+def _merge_search_pages(gis, queries, page_size=100, sort_field=None, sort_order=None, max_workers=_MAX_WORKERS):
+    '''
+    Yields the items of several portal searches lazily, fetching further
+    pages only as items are consumed. The first page of every search is
+    fetched concurrently. If a sort field is given the results are merged
+    in sort order, otherwise the searches are yielded one after another.
+    Errors of any search are raised.
+    '''
+    searches = [_search_pages(gis, query, page_size, sort_field, sort_order) for query in queries]
+    first_pages = []
+    for search, items, error in _run_concurrently(lambda search: next(search, []), searches, max_workers):
+        if error is not None:
+            raise error
+        first_pages.append(items)
+
+    def _items(first_page, search):
+        for item in first_page:
+            yield item
+        for items in search:
+            for item in items:
+                yield item
+
+    streams = [_items(first_page, search) for first_page, search in zip(first_pages, searches)]
+    if not sort_field:
+        for stream in streams:
+            for item in stream:
+                yield item
+        return
+    descending = (sort_order or 'asc').lower() == 'desc'
+
+    def _key(item):
+        value = _loaded_property(item, sort_field)
+        if isinstance(value, str):
+            #the portal sorts text case insensitively
+            value = value.lower()
+        #items without a value come last in either order
+        return (value is not None, value) if descending else (value is None, value)
+
+    for item in heapq.merge(*streams, key=_key, reverse=descending):
+        yield item
+
+def _iter_items(gis, itemids, max_workers=_MAX_WORKERS):
+    '''
+    Resolves item ids to items with one `id:a OR id:b ...` portal search per
+    _ITEM_IDS_PER_QUERY ids, the searches running concurrently. The ids a
+    search does not return, e.g. items not indexed yet, or all of its ids if
+    it fails, are fetched one by one. Yields a dictionary of
+    itemid to item per search, in the order of the ids, as soon as it and
+    the earlier searches have completed, without the items that are missing
+    or inaccessible.
+    '''
+    itemids = list(OrderedDict.fromkeys(itemids))
+    chunks = [itemids[start:start+_ITEM_IDS_PER_QUERY] for start in range(0, len(itemids), _ITEM_IDS_PER_QUERY)]
+    if not chunks:
+        return
+
+    def _resolve(ids):
+        query = ' OR '.join('id:' + itemid for itemid in ids)
+        found = {}
+        try:
+            for items in _search_pages(gis, query):
+                found.update((item.id, item) for item in items)
+        except Exception:
+            found = {}
+        #the search index lags behind recently added items
+        for itemid in ids:
+            if found.get(itemid) is None:
+                try:
+                    found[itemid] = gis.content.get(itemid)
+                except:
+                    pass
+        return OrderedDict((itemid, found[itemid]) for itemid in ids if found.get(itemid) is not None)
+
+    max_workers = max(1, min(max_workers, len(chunks)))
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        futures = [executor.submit(_resolve, ids) for ids in chunks]
+        try:
+            for future in futures:
+                yield future.result()
+        finally:
+            # stop pending searches if the caller stops consuming early
+            for future in futures:
+                future.cancel()
+
+def _get_items(gis, itemids, max_workers=_MAX_WORKERS):
+    '''
+    Resolves item ids to items with batched, concurrent portal searches (see
+    `_iter_items`). Returns a dictionary of itemid to item, without the items
+    that are missing or inaccessible.
+    '''
+    resolved = {}
+    for found in _iter_items(gis, itemids, max_workers):
+        resolved.update(found)
+    return resolved
+
+def _add_to_content_group(gis, items_list, group_id, max_workers=_MAX_WORKERS):
+    '''
+    Shares a list of items or item ids with a content group, keeping their
+    existing sharing. Ids are resolved in batches. The sharing to keep is
+    read from the access level loaded with each item, without a request per
+    item. Items of the current user with the same access level are shared
+    together, in concurrent requests of up to _ITEMS_PER_SHARE items; items
+    owned by other users are shared one by one, as the owner path is needed
+    to share them. None elements are skipped.
+    Returns {'results': [...]} with one result per element of items_list,
+    in order, each with the itemId, success and notSharedWith keys and an
+    error message for the items that could not be shared.
+    '''
+    items_list = [element for element in items_list if element is not None]
+    itemids = [element if isinstance(element, str) else element.id for element in items_list]
+    items = {element.id: element for element in items_list if not isinstance(element, str)}
+    missing = [itemid for itemid in itemids if itemid not in items]
+    if missing:
+        items.update(_get_items(gis, missing, max_workers))
+    results = OrderedDict((itemid, {'itemId': itemid, 'success': False, 'notSharedWith': [],
+                                    'error': 'Item not found or inaccessible.'}) for itemid in itemids)
+
+    #Group the items of the current user by the sharing to keep. Sharing with
+    #groups is additive, only the everyone and org flags need to be kept
+    username = gis.users.me.username
+    signatures = OrderedDict()
+    batches = []
+    for item in items.values():
+        access = _loaded_property(item, 'access') or item.access
+        signature = (access == 'public', access == 'org')
+        if _loaded_property(item, 'owner') == username:
+            signatures.setdefault(signature, []).append(item)
+        else:
+            batches.append((signature, [item]))
+
+    #Share the items of each signature, _ITEMS_PER_SHARE at a time
+    for signature, signature_items in signatures.items():
+        for start in range(0, len(signature_items), _ITEMS_PER_SHARE):
+            batches.append((signature, signature_items[start:start+_ITEMS_PER_SHARE]))
+
+    def _share(batch):
+        (everyone, org), batch_items = batch
+        if _loaded_property(batch_items[0], 'owner') != username:
+            return batch_items[0].share(everyone=everyone, org=org, groups=[group_id])
+        return gis.content.share_items(batch_items, everyone=everyone, org=org, groups=[group_id])
+
+    for (signature, batch_items), status, error in _run_concurrently(_share, batches, max_workers):
+        shared = {}
+        if error is None:
+            shared = {result.get('itemId', batch_items[0].id): result for result in status.get('results', [])}
+        for item in batch_items:
+            result = shared.get(item.id)
+            if result is None:
+                result = {'itemId': item.id, 'success': False, 'notSharedWith': [],
+                          'error': str(error) if error is not None else 'Item was not shared.'}
+            results[item.id] = result
+    return {'results': list(results.values())}
+
+def _transfer_items(gis, items, target_owner, group=None, max_workers=_MAX_WORKERS, progress=None):
+    '''
+    Reassigns a list of items to target_owner through a bounded thread pool.
+    If a group is given, the items are unshared from it first and shared
+    back with it, allowing members to edit, once they have been reassigned.
+    Unsharing and sharing are done in concurrent requests of up to
+    _ITEMS_PER_SHARE items, with the item objects at hand since sharing
+    only needs their ids.
+    `progress`, if given, is called with (done, total) as each item is
+    reassigned.
+    Returns a dictionary of itemid to the error raised for every item that
+    could not be transferred. Empty if all items were transferred.
+    '''
+    items = list(items)
+    errors = OrderedDict()
+
+    def _chunks(elements):
+        return [elements[start:start+_ITEMS_PER_SHARE] for start in range(0, len(elements), _ITEMS_PER_SHARE)]
+
+    def _failed(chunks, status_key, message):
+        #record the items of every chunk that failed, in whole or in part
+        failed = set()
+        for chunk, status, error in chunks:
+            statuses = {}
+            if error is None:
+                statuses = {result.get('itemId'): result for result in status.get('results', [])}
+            for item in chunk:
+                result = statuses.get(item.id)
+                if error is not None:
+                    errors[item.id] = error
+                elif result is not None and (not result.get('success', True) or result.get(status_key)):
+                    errors[item.id] = Exception(message)
+                else:
+                    continue
+                failed.add(item.id)
+        return failed
+
+    if group is not None and items:
+        unshared = _run_concurrently(lambda chunk: gis.content.unshare_items(chunk, groups=[group]), _chunks(items), max_workers)
+        failed = _failed(unshared, 'notUnsharedFrom', 'Unable to unshare the item from the group.')
+        items = [item for item in items if item.id not in failed]
+
+    for done, (item, result, error) in enumerate(_iter_concurrently(lambda item: item.reassign_to(target_owner), items, max_workers), 1):
+        if error is not None:
+            errors[item.id] = error
+        elif result is False:
+            errors[item.id] = Exception('Unable to reassign the item.')
+        if progress is not None:
+            progress(done, len(items))
+
+    if group is not None and items:
+        #share back every unshared item, including those that kept their owner
+        shared = _run_concurrently(lambda chunk: gis.content.share_items(chunk, groups=[group], allow_members_to_edit=True), _chunks(items), max_workers)
+        _failed(shared, 'notSharedWith', 'Unable to share the item back with the group.')
+    return errors
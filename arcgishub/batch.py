@@ -0,0 +1,181 @@
+from arcgishub._utils import _active_batch, _changed_paths, _fingerprint, _run_concurrently, _save_definition
+from collections import OrderedDict
+from collections.abc import Mapping
+import copy
+import threading
+
+def _copy_path(source, target, path):
+    '''
+    Copies the value of a definition path (e.g. `values.pages`) from one
+    definition to another, removing it from the target if the source has none.
+    '''
+    key, _, subkey = path.partition('.')
+    if not subkey:
+        if key in source:
+            target[key] = copy.deepcopy(source[key])
+        else:
+            target.pop(key, None)
+        return
+    value = source.get(key)
+    if isinstance(value, Mapping) and subkey in value:
+        if not isinstance(target.get(key), Mapping):
+            target[key] = {}
+        target[key][subkey] = copy.deepcopy(value[subkey])
+    elif isinstance(target.get(key), Mapping):
+        target[key].pop(subkey, None)
+
+class Batch(object):
+    """
+    A unit of work for site and page definition edits. This class is not created by
+    users directly. An instance is returned by `hub.batch()` and used as a context manager.
+
+    While the batch is open, edits that write a site or page definition (linking and
+    unlinking pages, renaming page slugs, adding and removing catalog groups) are
+    recorded instead of written. Page item updates (e.g. the title set by `Page.update`)
+    are deferred as well. Repeated edits to the same item are coalesced, and sites and
+    pages fetched while the batch is open share the pending definition of their item.
+    Edits of the same item made through objects fetched before the batch are merged
+    into one write; an exception is raised if they change the same part of the
+    definition differently. When the batch exits, every changed item is written
+    exactly once, concurrently. If the block raises, nothing is written.
+
+    .. note::
+        The batch applies to every site and page of the Hub's GIS, from any thread,
+        while it is open. Opening a batch within an open batch joins the outer one.
+
+    .. code-block:: python
+
+        USAGE EXAMPLE: Link pages to several sites with one write per item
+
+        with myHub.batch():
+            for site in sites:
+                for page in pages:
+                    site.pages.link(page)
+    """
+
+    def __init__(self, gis, max_workers=8):
+        self._gis = gis
+        self._max_workers = max_workers
+        self._lock = threading.Lock()
+        self._dirty = OrderedDict()
+        self._properties = {}
+        self._outer = None
+        self.errors = {}
+
+    def __repr__(self):
+        return '<%s pending:%d>' % (type(self).__name__, len(self._dirty))
+
+    def __enter__(self):
+        self._outer = _active_batch(self._gis)
+        if self._outer is not None:
+            return self._outer
+        self._gis._hub_batch = self
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self._outer is not None:
+            return False
+        self._gis._hub_batch = None
+        if exc_type is not None:
+            self.discard()
+            return False
+        errors = self.flush()
+        if errors:
+            raise Exception('Unable to save %d of the edited items: %s' % (
+                len(errors), ', '.join('%s (%s)' % (itemid, error) for itemid, error in errors.items())))
+        return False
+
+    @property
+    def pending(self):
+        """
+        Returns the itemids of the sites and pages waiting to be written.
+        """
+        with self._lock:
+            return list(self._dirty)
+
+    def _record(self, obj, item_properties=None):
+        """
+        Marks the definition of a Site or Page as changed, along with the optional
+        item properties to write with it. The changes of another object of the same
+        item are merged into the definition already recorded.
+        """
+        with self._lock:
+            recorded = self._dirty.get(obj.itemid)
+            if recorded is None:
+                self._dirty[obj.itemid] = obj
+            elif recorded is not obj and obj._definition_loaded and recorded.definition is not obj.definition:
+                self._merge(recorded, obj)
+            if item_properties:
+                self._properties[obj.itemid] = dict(self._properties.get(obj.itemid, {}), **item_properties)
+
+    def _merge(self, recorded, obj):
+        """
+        Applies the definition changes of an object to the definition recorded for
+        its item, and makes the object share that definition. Raises an exception
+        if both changed the same path to different values.
+        """
+        if not recorded._definition_loaded or recorded.definition is None:
+            self._dirty[obj.itemid] = obj
+            return
+        ours = _fingerprint(recorded.definition)
+        theirs = _fingerprint(obj.definition)
+        changed = set(_changed_paths(recorded._baseline, recorded.definition))
+        paths = _changed_paths(obj._baseline, obj.definition)
+        conflicts = [path for path in paths if path in changed and ours.get(path) != theirs.get(path)]
+        if conflicts:
+            raise Exception('Conflicting edits of item %s in the open batch: %s' % (obj.itemid, ', '.join(conflicts)))
+        for path in paths:
+            if path not in changed:
+                _copy_path(obj.definition, recorded.definition, path)
+        obj.definition = recorded.definition
+        obj._baseline = recorded._baseline
+
+    def _pending_definition(self, itemid):
+        """
+        Returns the changed, not yet written, definition of an item or None.
+        """
+        with self._lock:
+            obj = self._dirty.get(itemid)
+        if obj is None:
+            return None
+        return obj.definition
+
+    def _forget(self, itemid):
+        """
+        Drops the pending write of an item, e.g. when the item is deleted.
+        """
+        with self._lock:
+            self._dirty.pop(itemid, None)
+            self._properties.pop(itemid, None)
+
+    def discard(self):
+        """
+        Drops all pending writes.
+        """
+        with self._lock:
+            self._dirty.clear()
+            self._properties.clear()
+
+    def flush(self):
+        """
+        Writes every changed definition, with the deferred item properties, once
+        per item, concurrently. Items that ended up unchanged are not written.
+
+        :return:
+           A dictionary of itemid to the error raised for every item that could not
+           be written. These items stay pending. Empty if all items were written.
+        """
+        with self._lock:
+            pending = [(obj, self._properties.get(itemid)) for itemid, obj in self._dirty.items()]
+        self.errors = {}
+        save = lambda entry: _save_definition(*entry)
+        for (obj, properties), result, error in _run_concurrently(save, pending, self._max_workers):
+            if error is not None:
+                self.errors[obj.itemid] = error
+                continue
+            with self._lock:
+                #keep the item pending if it was edited again meanwhile
+                if self._dirty.get(obj.itemid) is obj and self._properties.get(obj.itemid) is properties:
+                    del self._dirty[obj.itemid]
+                    self._properties.pop(obj.itemid, None)
+        return self.errors
@@ -1,5 +1,4 @@
 from collections import OrderedDict
-import requests
 import json
 from arcgishub import hub
 
@@ -15,6 +14,7 @@ class Post(OrderedDict):
         """
         self._hub = hub
         self._gis = self._hub.gis
+        self._session = self._hub._http_session
 
         self.postProperties = postProperties
 
@@ -166,7 +166,7 @@ class Post(OrderedDict):
             payload['appInfo'] = appInfo
         
         url = f"https://{self._hub._hub_environment}/api/discussions/v1/posts/{self.id}"
-        res = requests.patch(url, data=json.dumps(payload), headers=self.header)
+        res = self._session.patch(url, data=json.dumps(payload), headers=self.header)
         return Post(self._hub, res.json())
 
     def delete(self):
@@ -183,7 +183,7 @@ class Post(OrderedDict):
         >> True
         """
         url = f"https://{self._hub._hub_environment}/api/discussions/v1/posts/{self.id}"
-        res = requests.delete(url, headers=self.header)
+        res = self._session.delete(url, headers=self.header)
         
         if res.json()['success']:
             return True
@@ -217,7 +217,7 @@ class Post(OrderedDict):
         }
 
         url = f"https://{self._hub._hub_environment}/api/discussions/v1/reactions"
-        res = requests.post(url, headers=self.header, data=json.dumps(payload))
+        res = self._session.post(url, headers=self.header, data=json.dumps(payload))
 
         if res.json()['id']:
             # if there is a statusCode, then it was unable to add the reaction
@@ -247,7 +247,7 @@ class Post(OrderedDict):
         """
         
         url = f"https://{self._hub._hub_environment}/api/discussions/v1/reactions/{id}"
-        res = requests.delete(url, headers=self.header)
+        res = self._session.delete(url, headers=self.header)
 
         if res.json()['success']:
             return True
@@ -263,6 +263,7 @@ class PostManager(object):
 
         self._hub = hub
         self._gis = self._hub.gis
+        self._session = self._hub._http_session
 
         # used throughout all requests
         self.header = {
@@ -295,9 +296,9 @@ class PostManager(object):
             parameters = {
                 'num': max_posts
             }
-            res = requests.get(f"https://{self._hub._hub_environment}/api/discussions/v1/posts", headers=self.header, params=parameters)
+            res = self._session.get(f"https://{self._hub._hub_environment}/api/discussions/v1/posts", headers=self.header, params=parameters)
         else:
-           res = requests.get(f"https://{self._hub._hub_environment}/api/discussions/v1/posts", headers=self.header) 
+           res = self._session.get(f"https://{self._hub._hub_environment}/api/discussions/v1/posts", headers=self.header) 
 
         parsed_posts = res.json()['items']
     
@@ -321,7 +322,7 @@ class PostManager(object):
         post = myHub.discussions.posts.get('itemid12345')
         >> <title:"My Title" creator:prod-pre-hub created:2021-09-04T04:00:18.957Z>
         """
-        res = requests.get(f"https://{self._hub._hub_environment}/api/discussions/v1/posts/{id}", headers=self.header)
+        res = self._session.get(f"https://{self._hub._hub_environment}/api/discussions/v1/posts/{id}", headers=self.header)
         postProperties = res.json()
         return Post(self._hub, postProperties)
 
@@ -388,7 +389,7 @@ class PostManager(object):
             if key not in non_optional:
                 payload[key] = value
 
-        res = requests.post(f"https://{self._hub._hub_environment}/api/discussions/v1/posts", data=json.dumps(payload), headers=self.header)    
+        res = self._session.post(f"https://{self._hub._hub_environment}/api/discussions/v1/posts", data=json.dumps(payload), headers=self.header)    
 
         # return post object is found, if not raise Exception
         try:
@@ -407,6 +408,7 @@ class Channel(OrderedDict):
 
         self._hub = hub
         self._gis = self._hub.gis
+        self._session = self._hub._http_session
 
         # used throughout all requests
         self.header = {
@@ -567,7 +569,7 @@ class Channel(OrderedDict):
 
         
         url = f"https://{self._hub._hub_environment}/api/discussions/v1/channels/{self.id}"
-        res = requests.patch(url, data=json.dumps(payload), headers=self.header)
+        res = self._session.patch(url, data=json.dumps(payload), headers=self.header)
         return Channel(self._hub, res.json())
 
     def delete(self):
@@ -581,7 +583,7 @@ class Channel(OrderedDict):
         >> True
         """
         url = f"https://{self._hub._hub_environment}/api/discussions/v1/channels/{self.id}"
-        res = requests.delete(url, headers=self.header)
+        res = self._session.delete(url, headers=self.header)
         
         if res.json()['success']:
             return True
@@ -597,6 +599,7 @@ class ChannelManager(object):
 
         self._hub = hub
         self._gis = self._hub.gis
+        self._session = self._hub._http_session
 
         # used throughout all requests
         self.header = {
@@ -628,9 +631,9 @@ class ChannelManager(object):
             parameters = {
                 'num': max_channels
             }
-            res = requests.get(f"https://{self._hub._hub_environment}/api/discussions/v1/channels", headers=self.header, params=parameters)
+            res = self._session.get(f"https://{self._hub._hub_environment}/api/discussions/v1/channels", headers=self.header, params=parameters)
         else: 
-            res = requests.get(f"https://{self._hub._hub_environment}/api/discussions/v1/channels", headers=self.header)
+            res = self._session.get(f"https://{self._hub._hub_environment}/api/discussions/v1/channels", headers=self.header)
         
         parsed_channels = res.json()['items']
     
@@ -655,7 +658,7 @@ class ChannelManager(object):
         >> <channel_id:"itemid12345" access:"public" groups:[] creator:"prod-pre-hub">
         """
 
-        res = requests.get(f"https://{self._hub._hub_environment}/api/discussions/v1/channels/{id}", headers=self.header)
+        res = self._session.get(f"https://{self._hub._hub_environment}/api/discussions/v1/channels/{id}", headers=self.header)
         channelProperties = res.json()
         return Channel(self._hub, channelProperties)
 
@@ -720,7 +723,7 @@ class ChannelManager(object):
             if key not in non_optional:
                 payload[key] = value
 
-        res = requests.post(f"https://{self._hub._hub_environment}/api/discussions/v1/channels", data=json.dumps(payload), headers=self.header)
+        res = self._session.post(f"https://{self._hub._hub_environment}/api/discussions/v1/channels", data=json.dumps(payload), headers=self.header)
 
         # return Channel object is found, if not raise Exception
         try:
@@ -740,6 +743,7 @@ class Reaction(OrderedDict):
         """
         self._hub = hub
         self._gis = self._hub.gis
+        self._session = self._hub._http_session
         self.reactionProperties = reactionProperties
 
         self.header = {
@@ -797,7 +801,7 @@ class Reaction(OrderedDict):
         >> True
         """
 
-        res = requests.delete(f"https://{self._hub._hub_environment}/api/discussions/v1/reactions/{id}", headers=self.header)        
+        res = self._session.delete(f"https://{self._hub._hub_environment}/api/discussions/v1/reactions/{id}", headers=self.header)        
         if res.json()['success']:
             return True
         return False
\ No newline at end of file
@@ -0,0 +1,207 @@
+from arcgishub._utils import _run_concurrently
+from collections import OrderedDict
+import threading
+
+def _domain_registry(gis):
+    '''
+    Returns the DomainRegistry of a GIS, or None if none was created.
+    '''
+    return getattr(gis, '_hub_domain_registry', None)
+
+def _record_domain(gis, record):
+    '''
+    Adds a domain record created through the Hub to the registry of the GIS, if loaded.
+    '''
+    registry = _domain_registry(gis)
+    if registry is not None:
+        registry._apply(record)
+
+def _discard_site_domains(gis, site_id):
+    '''
+    Drops the domain records of a site from the registry of the GIS, if any.
+    '''
+    registry = _domain_registry(gis)
+    if registry is not None:
+        registry._discard_site(site_id)
+
+class DomainRegistry(object):
+    """
+    In-memory snapshot of the Hub domain records of an ArcGIS Online organization.
+    This class is not created by users directly. An instance is available as the
+    `domains` property of the SiteManager.
+
+    The records are loaded with a single request on first use and indexed by hostname,
+    siteId and clientKey, so that lookups and subdomain availability checks need no
+    request. Domain records created, changed or deleted through this Hub (adding sites,
+    updating their subdomain, deleting them) are applied to the snapshot as they happen.
+    Call `refresh()` to pick up the changes made elsewhere.
+
+    .. code-block:: python
+
+        USAGE EXAMPLE: Check subdomains before provisioning sites
+
+        registry = myHub.sites.domains
+        free = [name for name in names if registry.is_available(name)]
+    """
+
+    def __init__(self, hub):
+        self._hub = hub
+        self._gis = hub.gis
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._by_hostname = {}
+        self._by_site = {}
+        self._by_client_key = {}
+
+    def __repr__(self):
+        return '<%s records:%s>' % (type(self).__name__, len(self._by_hostname) if self._loaded else 'not loaded')
+
+    def __len__(self):
+        self._ensure_loaded()
+        with self._lock:
+            return len(self._by_hostname)
+
+    def __iter__(self):
+        self._ensure_loaded()
+        with self._lock:
+            return iter(list(self._by_hostname.values()))
+
+    def __contains__(self, hostname):
+        return self.get(hostname) is not None
+
+    @property
+    def loaded(self):
+        """
+        Returns True once the domain records have been loaded.
+        """
+        return self._loaded
+
+    def _path(self, query=''):
+        return f"https://{self._hub._hub_environment}/api/v3/domains" + query
+
+    def _ensure_loaded(self):
+        if not self._loaded:
+            self.refresh()
+
+    def _index(self, record):
+        """
+        Adds a domain record to the indexes, replacing the record of its hostname.
+        """
+        hostname = record['hostname'].lower()
+        with self._lock:
+            self._unindex(self._by_hostname.get(hostname))
+            self._by_hostname[hostname] = record
+            self._by_site.setdefault(record.get('siteId'), []).append(record)
+            if record.get('clientKey'):
+                self._by_client_key[record['clientKey']] = record
+
+    def _unindex(self, record):
+        """
+        Removes a domain record from the indexes.
+        """
+        if record is None:
+            return
+        with self._lock:
+            self._by_hostname.pop(record['hostname'].lower(), None)
+            records = [other for other in self._by_site.get(record.get('siteId'), []) if other is not record]
+            if records:
+                self._by_site[record.get('siteId')] = records
+            else:
+                self._by_site.pop(record.get('siteId'), None)
+            if self._by_client_key.get(record.get('clientKey')) is record:
+                del self._by_client_key[record['clientKey']]
+
+    def _apply(self, record):
+        """
+        Records a domain record created through this Hub, if the snapshot is loaded.
+        """
+        if self._loaded:
+            self._index(record)
+
+    def _discard_site(self, site_id):
+        """
+        Drops the domain records of a site, e.g. when they are deleted through this Hub.
+        """
+        with self._lock:
+            for record in list(self._by_site.get(site_id, [])):
+                self._unindex(record)
+
+    def refresh(self, site_ids=None, max_workers=8):
+        """
+        Loads the domain records of the organization.
+
+        ===============     ====================================================================
+        **Argument**        **Description**
+        ---------------     --------------------------------------------------------------------
+        site_ids            Optional list of site item ids. If provided, only the records of
+                            these sites are fetched again, concurrently, and replaced in the
+                            snapshot. Otherwise all the records are loaded with one request.
+        ---------------     --------------------------------------------------------------------
+        max_workers         Optional integer. The maximum number of concurrent requests when
+                            refreshing a list of sites. Default is 8.
+        ===============     ====================================================================
+
+        :return:
+           The registry.
+        """
+        if site_ids is None or not self._loaded:
+            records = self._gis._con.get(path=self._path("?orgId=" + self._gis.properties.id))
+            with self._lock:
+                self._by_hostname, self._by_site, self._by_client_key = {}, {}, {}
+                for record in records:
+                    self._index(record)
+                self._loaded = True
+            return self
+        site_ids = list(OrderedDict.fromkeys(site_ids))
+        fetch = lambda site_id: self._gis._con.get(path=self._path("?siteId=" + site_id))
+        for site_id, records, error in _run_concurrently(fetch, site_ids, max_workers):
+            if error is not None:
+                raise error
+            with self._lock:
+                self._discard_site(site_id)
+                for record in records:
+                    self._index(record)
+        return self
+
+    def hostname(self, subdomain):
+        """
+        Returns the hostname of a subdomain in this organization, e.g.
+        'opendata-myorg.hub.arcgis.com' for 'opendata'.
+        """
+        subdomain = subdomain.replace(' ', '-').lower()
+        return subdomain + '-' + self._gis.properties['urlKey'] + '.' + self._hub._hub_environment
+
+    def get(self, hostname):
+        """
+        Returns the domain record of a hostname or url, or None if it is not registered.
+        """
+        self._ensure_loaded()
+        hostname = hostname.lower()
+        if '://' in hostname:
+            hostname = hostname.split('://', 1)[1]
+        hostname = hostname.split('/', 1)[0]
+        with self._lock:
+            return self._by_hostname.get(hostname)
+
+    def for_site(self, site_id):
+        """
+        Returns the list of domain records of a site item id.
+        """
+        self._ensure_loaded()
+        with self._lock:
+            return list(self._by_site.get(site_id, []))
+
+    def for_client_key(self, client_key):
+        """
+        Returns the domain record of a clientKey, or None if it is not registered.
+        """
+        self._ensure_loaded()
+        with self._lock:
+            return self._by_client_key.get(client_key)
+
+    def is_available(self, subdomain):
+        """
+        Returns True if no site of the organization uses the subdomain, according to
+        the snapshot.
+        """
+        return self.get(self.hostname(subdomain)) is None
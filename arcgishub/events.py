@@ -1,6 +1,5 @@
 from arcgis._impl.common._mixins import PropertyMap
 from collections import OrderedDict
-from arcgis.geocoding import geocode
 import json
 
 class Event(OrderedDict):
@@ -337,6 +336,7 @@ class EventManager(object):
             geometry = event_properties['geometry']
             del event_properties['geometry']
         except:
+            from arcgis.geocoding import geocode
             geometry = geocode(event_properties['address1'])[0]['location']
 
         event_properties['schemaVersion'] = 2
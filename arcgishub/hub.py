@@ -2,12 +2,15 @@ from arcgis.gis import GIS
 from arcgis._impl.common._mixins import PropertyMap
 from arcgishub.sites import SiteManager, Site
 from arcgishub.pages import PageManager
+from arcgishub.batch import Batch
 from arcgishub.initiatives import Initiative, InitiativeManager
 from arcgishub.events import Event, EventManager
 from arcgishub import discussions
 from arcgishub.discussions import ChannelManager, PostManager
 from datetime import datetime
-from collections import OrderedDict
+from collections import OrderedDict, namedtuple
+from requests.adapters import HTTPAdapter
+import requests
 
 def _lazy_property(fn):
     '''Decorator that makes a property lazy-evaluated.
@@ -22,6 +25,10 @@ def _lazy_property(fn):
         return getattr(self, attr_name)
     return _lazy_property
 
+#Immutable snapshot of the organization settings used throughout the Hub
+_OrgContext = namedtuple('_OrgContext', ['hub_enabled', 'hub_environment', 'enterprise_org_id', 
+                                         'community_org_id', 'enterprise_org_url', 'community_org_url'])
+
 class Hub(object):
     """
     Entry point into the Hub module. Lets you access an individual hub and its components.
@@ -63,66 +70,143 @@ class Hub(object):
     profile             Optional string. the name of the profile that the user wishes to use
                         to authenticate, if set, the identified profile will be used to login
                         to the specified GIS.
+    ----------------    ---------------------------------------------------------------
+    pool_size           Optional integer. The number of keep-alive connections kept open
+                        by the HTTP session shared by the Hub Discussions resources.
+                        The default is 10.
+    ----------------    ---------------------------------------------------------------
+    gis                 Optional GIS object. An existing connection to use for this Hub,
+                        in which case the connection arguments above are ignored.
     ================    ===============================================================
     """
     
     def __init__(self, url=None, username=None, password=None, key_file=None, cert_file=None,
-                 verify_cert=True, set_active=True, client_id=None, profile=None):
-        #self.gis = gis
+                 verify_cert=True, set_active=True, client_id=None, profile=None, pool_size=10, gis=None):
         self._username = username
         self._password = password
-        if url==None:
-            self.url = 'https://www.arcgis.com'
+        if gis is not None:
+            self.gis = gis
+            self.url = gis.url
         else:
-            self.url = url
-        self.gis = GIS(self.url, self._username, self._password, key_file, cert_file, verify_cert,
-                        set_active, client_id, profile)
+            if url==None:
+                self.url = 'https://www.arcgis.com'
+            else:
+                self.url = url
+            self.gis = GIS(self.url, self._username, self._password, key_file, cert_file, verify_cert,
+                            set_active, client_id, profile)
         try:
             self._gis_id = self.gis.properties.id
         except AttributeError:
             self._gis_id = None
+        self._pool_size = pool_size
+        self._context = None
+
+    def _read_org_context(self):
+        """
+        Reads the Hub related organization settings from the GIS properties.
+        """
+        properties = self.gis.properties
+        #Hub enabled
+        try:
+            properties.portalProperties["hub"]["enabled"]
+            hub_enabled = True
+        except:
+            hub_enabled = False
+        #Hub url corresponding to the dev/qa/prod environment
+        url = self.gis.url
+        if 'devext' in url:
+            hub_environment = 'hubdev.arcgis.com'
+        elif 'mapsqa' in url or 'qaext' in url: # mapsqa is for orgs, but qaext is for front door
+            hub_environment = 'hubqa.arcgis.com'
+        else:
+            hub_environment = 'hub.arcgis.com'
+        #Enterprise and Community org ids
+        enterprise_org_id = None
+        community_org_id = None
+        if hub_enabled:
+            try:
+                enterprise_org_id = properties.portalProperties.hub.settings.enterpriseOrg.orgId
+            except AttributeError:
+                try:
+                    if properties.subscriptionInfo.companionOrganizations.type=='Enterprise':
+                        enterprise_org_id = 'Enterprise org id is not available'
+                except:
+                    enterprise_org_id = self._gis_id
+            try:
+                community_org_id = properties.portalProperties.hub.settings.communityOrg.orgId
+            except AttributeError:
+                try:
+                    if properties.subscriptionInfo.companionOrganizations.type=='Community':
+                        community_org_id = 'Community org id is not available'
+                except:
+                    community_org_id = self._gis_id
+        #Enterprise and Community org urls, None if Hub is inaccessible
+        enterprise_org_url = None
+        community_org_url = None
+        try:
+            properties.portalProperties.hub
+            try:
+                _url = properties.publicSubscriptionInfo.companionOrganizations[0]['organizationUrl']
+            except:
+                try:
+                    _url = properties.subscriptionInfo.companionOrganizations[0]['organizationUrl']
+                except:
+                    _url = None
+            try:
+                properties.portalProperties.hub.settings.enterpriseOrg
+                enterprise_org_url = "https://"+_url
+            except (AttributeError, TypeError): 
+                enterprise_org_url = url
+            try:
+                properties.portalProperties.hub.settings.communityOrg
+                community_org_url = "https://"+_url
+            except (AttributeError, TypeError): 
+                community_org_url = url
+        except AttributeError:
+            pass
+        return _OrgContext(hub_enabled, hub_environment, enterprise_org_id, community_org_id,
+                           enterprise_org_url, community_org_url)
+
+    @property
+    def _org_context(self):
+        """
+        Returns the memoized snapshot of the organization settings used by the Hub.
+        """
+        if self._context is None:
+            self._context = self._read_org_context()
+        return self._context
+
+    def refresh(self):
+        """
+        Re-reads the organization properties and rebuilds the organization settings
+        (Hub enabled, environment, Enterprise and Community orgs) memoized by this Hub.
+        Call this after the organization settings have changed.
+        """
+        self.gis._properties = None
+        self._context = None
+        return self._org_context
 
     @property
     def _hub_enabled(self):
         """
         Returns True if Hub is enabled on this org
         """
-        try:
-            self.gis.properties.portalProperties["hub"]["enabled"]
-            return True
-        except:
-            return False
+        return self._org_context.hub_enabled
 
     @property
     def _hub_environment(self):
         """
         Returns the hub url corresponding to the dev/qa/prod environment.
         """
-        url = self.gis.url
-        print(f"_hub_environment: {url}")
-        if 'devext' in url:
-            return 'hubdev.arcgis.com'
-        elif 'mapsqa' in url or 'qaext' in url: # mapsqa is for orgs, but qaext is for front door
-            return 'hubqa.arcgis.com'
-        else:
-            return 'hub.arcgis.com'
+        return self._org_context.hub_environment
             
     @property
     def enterprise_org_id(self):
         """
         Returns the AGOL org id of the Enterprise Organization associated with this Hub.
         """
-
         if self._hub_enabled:
-            try:
-                _e_org_id = self.gis.properties.portalProperties.hub.settings.enterpriseOrg.orgId
-                return _e_org_id
-            except AttributeError:
-                try:
-                    if self.gis.properties.subscriptionInfo.companionOrganizations.type=='Enterprise':
-                        return 'Enterprise org id is not available'
-                except:
-                    return self._gis_id
+            return self._org_context.enterprise_org_id
         else:
             raise Exception("Hub does not exist or is inaccessible.")
 
@@ -132,15 +216,7 @@ class Hub(object):
         Returns the AGOL org id of the Community Organization associated with this Hub.
         """
         if self._hub_enabled:
-            try:
-                _c_org_id = self.gis.properties.portalProperties.hub.settings.communityOrg.orgId
-                return _c_org_id
-            except AttributeError:
-                try:
-                    if self.gis.properties.subscriptionInfo.companionOrganizations.type=='Community':
-                        return 'Community org id is not available'
-                except:
-                    return self._gis_id
+            return self._org_context.community_org_id
         else:
             raise Exception("Hub does not exist or is inaccessible.")
         
@@ -149,41 +225,56 @@ class Hub(object):
         """
         Returns the AGOL org url of the Enterprise Organization associated with this Hub.
         """
-        try:
-            self.gis.properties.portalProperties.hub
-            try:
-                self.gis.properties.portalProperties.hub.settings.enterpriseOrg
-                try:
-                    _url = self.gis.properties.publicSubscriptionInfo.companionOrganizations[0]['organizationUrl']
-                except:
-                    _url = self.gis.properties.subscriptionInfo.companionOrganizations[0]['organizationUrl']
-                return "https://"+_url
-            except AttributeError: 
-                return self.gis.url
-        except AttributeError:
-            print("Hub does not exist or is inaccessible.")
-            raise
+        if self._org_context.enterprise_org_url is None:
+            raise AttributeError("Hub does not exist or is inaccessible.")
+        return self._org_context.enterprise_org_url
         
     @property
     def community_org_url(self):
         """
         Returns the AGOL org id of the Community Organization associated with this Hub.
         """
-        try:
-            self.gis.properties.portalProperties.hub
-            try:
-                self.gis.properties.portalProperties.hub.settings.communityOrg
-                try:
-                    _url = self.gis.properties.publicSubscriptionInfo.companionOrganizations[0]['organizationUrl']
-                except:
-                    _url = self.gis.properties.subscriptionInfo.companionOrganizations[0]['organizationUrl']
-                return "https://"+_url
-            except AttributeError: 
-                return self.gis.url
-        except:
-            print("Hub does not exist or is inaccessible.")
-            raise
+        if self._org_context.community_org_url is None:
+            raise AttributeError("Hub does not exist or is inaccessible.")
+        return self._org_context.community_org_url
     
+    @_lazy_property
+    def _http_session(self):
+        """
+        HTTP session with a pool of keep-alive connections, shared by all
+        the Hub Discussions resources of this hub.
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self._pool_size, pool_maxsize=self._pool_size)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def batch(self, max_workers=8):
+        """
+        Returns a unit of work for site and page definition edits, to be used as
+        a context manager. Within the block, edits to site and page definitions
+        are recorded and each changed item is written once, concurrently, when
+        the block exits. See :class:`~hub.batch.Batch`.
+
+        ===============     ====================================================================
+        **Argument**        **Description**
+        ---------------     --------------------------------------------------------------------
+        max_workers         Optional integer. The maximum number of concurrent writes when the
+                            batch is flushed. Default is 8.
+        ===============     ====================================================================
+
+        .. code-block:: python
+
+            USAGE EXAMPLE: Move all pages of a site to another site
+
+            with myHub.batch():
+                for page in site1.pages.search():
+                    site2.pages.link(page)
+                    site1.pages.unlink(page)
+        """
+        return Batch(self.gis, max_workers=max_workers)
+
     @_lazy_property
     def initiatives(self):
         """
@@ -1,14 +1,25 @@
 from arcgis._impl.common._mixins import PropertyMap
-from arcgis.features import FeatureLayer
-from arcgis.features.enrich_data import enrich_layer
+from arcgishub._utils import _get_items, _run_concurrently
 from collections import OrderedDict
 from datetime import datetime
-import pandas as pd
+import threading
 import time
-import matplotlib.pyplot as plt
-import seaborn as sns
+import copy
 import json
-sns.set(color_codes=True)
+
+_seaborn_styled = False
+
+def _pyplot():
+    '''Imports matplotlib, styled with seaborn, on first use of the charts.
+    Deferred so that importing the module does not pay for the plotting stack.
+    '''
+    global _seaborn_styled
+    import matplotlib.pyplot as plt
+    if not _seaborn_styled:
+        import seaborn as sns
+        sns.set(color_codes=True)
+        _seaborn_styled = True
+    return plt
 
 def _lazy_property(fn):
     '''Decorator that makes a property lazy-evaluated.
@@ -23,6 +34,134 @@ def _lazy_property(fn):
         return getattr(self, attr_name)
     return _lazy_property
 
+class _SolutionTemplates(object):
+    """
+    Resolves the indicators offered by the solution templates of initiative templates.
+    The data of the templates is fetched concurrently and cached by item id and
+    modified time, and the indicators are indexed by id, so that resolving them again
+    only checks the templates for changes.
+    """
+
+    def __init__(self, gis, max_workers=8):
+        self._gis = gis
+        self._max_workers = max_workers
+        self._lock = threading.Lock()
+        self._data = {}
+        self._indexes = {}
+
+    def _template_data(self, items):
+        """
+        Returns the data of a list of template items, fetching the data of the items
+        that are not cached or were modified since, concurrently.
+        """
+        with self._lock:
+            stale = [item for item in items if self._data.get(item.id, (None, None))[0] != item.modified]
+        for item, data, error in _run_concurrently(lambda item: item.get_data(), stale, self._max_workers):
+            if error is not None:
+                raise error
+            with self._lock:
+                self._data[item.id] = (item.modified, data)
+        with self._lock:
+            return [self._data[item.id][1] for item in items]
+
+    def indicators(self, itemplateid):
+        """
+        Returns a dictionary of indicator id to indicator definition for the indicators
+        of the solution templates of an initiative template.
+        """
+        _itemplate = self._gis.content.get(itemplateid)
+        _itemplatedata, = self._template_data([_itemplate])
+        #Resolve the solution templates of every step with batched searches
+        _stemplateids = [_stemplateid for step in _itemplatedata['steps'] for _stemplateid in step['templateIds']]
+        _found = _get_items(self._gis, _stemplateids, self._max_workers)
+        _stemplates = [_found[_stemplateid] for _stemplateid in _stemplateids if _stemplateid in _found]
+        #Reuse the index if no template changed
+        key = tuple((item.id, item.modified) for item in [_itemplate] + _stemplates)
+        with self._lock:
+            cached = self._indexes.get(itemplateid)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        index = {}
+        for _stemplatedata in self._template_data(_stemplates):
+            for indicator in _stemplatedata['indicators']:
+                index.setdefault(indicator['id'], indicator)
+        with self._lock:
+            self._indexes[itemplateid] = (key, index)
+        return index
+
+_solution_templates_lock = threading.Lock()
+
+def _solution_templates(gis):
+    """
+    Returns the solution template resolver of a GIS, shared by all its initiatives.
+    """
+    with _solution_templates_lock:
+        resolver = getattr(gis, '_hub_solution_templates', None)
+        if resolver is None:
+            resolver = gis._hub_solution_templates = _SolutionTemplates(gis)
+        return resolver
+
+class _InitiativeData(object):
+    """
+    The data of an initiative item, shared by an Initiative, its IndicatorManager and
+    their Indicators. The data is fetched once, on first access. Every write goes
+    through `update`, which edits the latest data and bumps `version`, so that edits
+    made through one object are seen by all the others instead of being overwritten
+    by stale copies.
+    """
+
+    def __init__(self, item):
+        self.item = item
+        self.version = 0
+        self._data = None
+        self._loaded = False
+        self._lock = threading.RLock()
+
+    @property
+    def loaded(self):
+        return self._loaded
+
+    @property
+    def data(self):
+        """
+        Returns the initiative data, fetching it on first access.
+        """
+        with self._lock:
+            if not self._loaded:
+                self._data = self.item.get_data()
+                self._loaded = True
+            return self._data
+
+    def set(self, data):
+        """
+        Replaces the initiative data with already fetched data.
+        """
+        with self._lock:
+            if data is not self._data or not self._loaded:
+                self._data = data
+                self._loaded = True
+                self.version += 1
+
+    def update(self, edit):
+        """
+        Calls `edit` on a copy of the latest data and writes the result to the item.
+        The shared data is only replaced if the write succeeds. Raises an exception,
+        without writing, if `edit` changed anything but the indicators.
+        :return:
+            The status of the item update.
+        """
+        with self._lock:
+            data = copy.deepcopy(self.data)
+            edit(data)
+            if {key: value for key, value in data.items() if key != 'indicators'} != \
+               {key: value for key, value in self.data.items() if key != 'indicators'}:
+                raise Exception('Indicator edits may only change the indicators of the initiative data')
+            status = self.item.update(item_properties={'text': json.dumps(data)})
+            if status:
+                self._data = data
+                self.version += 1
+            return status
+
 class Indicator(OrderedDict):
     """
     Represents an indicator within an initiative. Initiatives use Indicators to standardize 
@@ -30,17 +169,24 @@ class Indicator(OrderedDict):
     including features, calculated metrics, or quantified goals. 
     """
     
-    def __init__(self, gis, initiativeItem, indicatorObject):
+    def __init__(self, gis, initiativeItem, indicatorObject, initiativeData=None):
         """
         Constructs an empty Indicator object
         """
         self._gis = gis
         self._initiativeItem = initiativeItem
-        self._initiativedata = self._initiativeItem.get_data()
+        self._data = initiativeData if initiativeData is not None else _InitiativeData(initiativeItem)
         self._indicatordict = indicatorObject
         pmap = PropertyMap(self._indicatordict)
         self.definition = pmap
             
+    @property
+    def _initiativedata(self):
+        """
+        Returns the latest data of the initiative of the indicator
+        """
+        return self._data.data
+
     def __repr__(self):
         return '<%s id:"%s" optional:%s>' % (type(self).__name__, self.indicatorid, self.optional)
        
@@ -110,12 +256,72 @@ class Indicator(OrderedDict):
         """
         Returns the data for the indicator as a Spatial DataFrame.
         """
+        import pandas as pd
+        from arcgis.features import GeoAccessor
         try:
             _indicator_flayer = self.indicator_item.layers[0]
             return pd.DataFrame.spatial.from_layer(_indicator_flayer)
         except:
             return 'Data not configured for this indicator'
-        
+
+    def iter_data(self, where='1=1', out_fields='*', return_geometry=True, chunk_size=2000):
+        """
+        Yields the data for the indicator as DataFrames of at most `chunk_size` rows, paging
+        through the layer by objectid until a page comes back empty, so that large indicators
+        can be processed with bounded memory instead of being loaded whole as in `data_sdf`.
+        =======================    =============================================================
+        **Argument**               **Description**
+        -----------------------    -------------------------------------------------------------
+        where                      Optional string. The where clause selecting the features.
+                                   Default is '1=1', all features.
+        -----------------------    -------------------------------------------------------------
+        out_fields                 Optional string or list of field names to return. The
+                                   objectid field is always returned. Default is '*'.
+        -----------------------    -------------------------------------------------------------
+        return_geometry            Optional boolean. If True, the chunks are Spatial DataFrames
+                                   with the feature geometries. Default is True.
+        -----------------------    -------------------------------------------------------------
+        chunk_size                 Optional integer. The number of rows per chunk, capped at the
+                                   maximum record count of the layer. Default is 2000.
+        =======================    =============================================================
+        :return:
+            A generator of DataFrames, ordered by objectid.
+        .. code-block:: python
+            USAGE EXAMPLE: Count crashes per street without loading the whole layer
+            counts = None
+            for chunk in indicator1.iter_data(out_fields=['street'], return_geometry=False):
+                chunk_counts = chunk['street'].value_counts()
+                counts = chunk_counts if counts is None else counts.add(chunk_counts, fill_value=0)
+        """
+        _indicator_flayer = self.indicator_item.layers[0]
+        _properties = _indicator_flayer.properties
+        _oid = _properties.objectIdField
+        #the objectid field is needed to page through the layer
+        if out_fields != '*':
+            if isinstance(out_fields, str):
+                out_fields = [field.strip() for field in out_fields.split(',')]
+            if _oid not in out_fields:
+                out_fields = [_oid] + list(out_fields)
+            out_fields = ','.join(out_fields)
+        try:
+            chunk_size = min(chunk_size, _properties.maxRecordCount)
+        except (AttributeError, KeyError, TypeError):
+            pass
+        _last = None
+        while True:
+            #objectid keyset paging does not slow down with depth like result offsets
+            _where = where if _last is None else '(%s) AND %s > %d' % (where, _oid, _last)
+            featureset = _indicator_flayer.query(where=_where, out_fields=out_fields, return_geometry=return_geometry,
+                                                 order_by_fields=_oid + ' ASC', result_record_count=chunk_size,
+                                                 return_all_records=False)
+            chunk = featureset.sdf
+            #the layer may return fewer rows than asked without being exhausted,
+            #only an empty page ends the data
+            if chunk.empty:
+                return
+            yield chunk
+            _last = int(chunk[_oid].max())
+
     @property
     def mappings(self):
         """
@@ -139,46 +345,51 @@ class Indicator(OrderedDict):
         """
         if self._indicatordict is not None:
             _indicator_id = self._indicatordict['id']
-            self._initiativedata['indicators'] = list(filter(lambda indicator: indicator.get('id')!=_indicator_id, self._initiativedata['indicators']))
-            _new_initiativedata = json.dumps(self._initiativedata)
-            return self._initiativeItem.update(item_properties={'text': _new_initiativedata})
 
-    def _format_date(self, date):
-        """
-        Return date in Y-M-D
-        """
-        epoch_time = str(date)
-        return epoch_time
+            def _remove(data):
+                data['indicators'] = [indicator for indicator in data['indicators'] if indicator.get('id')!=_indicator_id]
+            return self._data.update(_remove)
 
     def _week_day(self, num):
         """
         Return Weekday/Weekend
         """
-        if num < 4:
+        if num < 5:
             return 'Weekday'
-        if num >= 4:
+        if num >= 5:
             return 'Weekend'
 
-    def _month(self, date):
-        """
-        Return month number
-        """
-        return str(date)[5:7]
-
-    def _hour(self, date):
+    def _temporal_profile(self, field):
         """
-        Return hour number
+        Returns the counts per hour, weekday/weekend and month of a date field of the
+        indicator data. The profile is computed with vectorized datetime accessors,
+        without adding columns to `data_sdf`, and memoized per field for as long as
+        `data_sdf` is the same frame.
         """
-        return str(date)[11:13]
+        import pandas as pd
+        indicator_df = self.data_sdf
+        cache = getattr(self, '_temporal_profiles', None)
+        if cache is None or cache[0] is not indicator_df:
+            cache = self._temporal_profiles = (indicator_df, {})
+        profiles = cache[1]
+        if field not in profiles:
+            dates = pd.to_datetime(indicator_df[field]).dropna()
+            weekdays = dates.dt.weekday
+            days = pd.Series('Weekend', index=weekdays.index).where(weekdays >= 5, 'Weekday')
+            profiles[field] = {
+                'hours': dates.dt.hour.value_counts(),
+                'days': days.value_counts(),
+                'months': dates.dt.month.value_counts(),
+            }
+        return profiles[field]
 
-    def _bar_chart(self, df, attribute):
+    def _bar_chart(self, counts, attribute):
         """
-        Generates a bar chart for given attribute if number of categories >= 7.
+        Generates a bar chart for given attribute counts if number of categories >= 7.
         """
-        #Bar chart for 1st category
-        counts1 = df[attribute].value_counts()
+        plt = _pyplot()
         #Generates bar graph
-        ax = counts1.plot(kind='barh', figsize=(12, 12), legend=True, fontsize=12, alpha=0.5)
+        ax = counts.plot(kind='barh', figsize=(12, 12), legend=True, fontsize=12, alpha=0.5)
         #X axis text and display style of categories
         ax.set_xlabel("Count", fontsize=12)
         #Y axis text
@@ -192,47 +403,48 @@ class Indicator(OrderedDict):
         #results.append(plt)
         plt.show()
 
-    def _pie_chart(self, df, attribute):
+    def _pie_chart(self, counts, attribute):
         """
-        Generates a pie chart for given attribute if number of categories < 7.
+        Generates a pie chart for given attribute counts if number of categories < 7.
         """
+        plt = _pyplot()
         
         #Data to plot
-        types = list(df[attribute].unique())
-        types = [category for category in types if category]
-        sizes = df[attribute].value_counts()
+        counts = counts[[bool(category) for category in counts.index]]
         #Plot
         plt.figure(figsize=(6,6))
         plt.title('Pie chart for '+attribute)
-        plt.pie(sizes, labels=types,
+        plt.pie(counts.values, labels=list(counts.index),
             autopct='%1.2f%%', shadow=True, startangle=100)
         plt.axis('equal')
         #results.append(plt)
         plt.show()
 
-    def _histogram_chart(self, df, attribute):
+    def _histogram_chart(self, counts, attribute):
         """
-        Generates a histogram for numerical attributes and datetime attributes.
+        Generates a histogram from the counts of the values of numerical attributes and
+        datetime attributes.
         """
+        plt = _pyplot()
         plt.figure(figsize=(8,8))
         bins=None
         if attribute=='month':
             bins=range(1,13)
-        n, bins, patches = plt.hist(df[attribute], bins=bins, alpha=0.5)
+        n, bins, patches = plt.hist(list(counts.index), weights=list(counts.values), bins=bins, alpha=0.5)
         plt.title("Distribution for "+attribute, fontsize=16)
         plt.xlabel(attribute, fontsize=16)
         plt.ylabel("Frequency", fontsize=16)
         #results.append(plt)
         plt.show()
 
-    def _line_chart(self, df, attribute):
+    def _line_chart(self, counts, attribute):
         """
-        Generates a line chart for datetime attribute.
+        Generates a line chart for the counts of a datetime attribute.
         """
-        hours = df[attribute].unique().tolist()
-        hours.sort()
-        frequency = df[attribute].value_counts(normalize=True, sort=False)
-        plt.plot(hours, frequency, color='red')
+        plt = _pyplot()
+        counts = counts.sort_index()
+        frequency = counts / counts.sum()
+        plt.plot(list(counts.index), frequency.values, color='red')
         plt.xlim(0, 24)
         plt.xlabel(attribute)
         plt.ylabel('Average count')
@@ -244,6 +456,9 @@ class Indicator(OrderedDict):
         """
         Generates a scatter chart for variables used to enrich boundaries.
         """
+        import pandas as pd
+        from arcgis.features.enrich_data import enrich_layer
+        plt = _pyplot()
         enrich_variables = ['TOTPOP_CY', 'MEDHINC_CY']
         enriched = enrich_layer(self.url, analysis_variables=enrich_variables, output_name='boundaryEnriched_'+self.itemid+str(int(time.time())))
         #Convert enriched to table
@@ -262,7 +477,138 @@ class Indicator(OrderedDict):
         plt.show()
         return enriched
 
-    def explore(self, subclass, display=True):
+    def _mapped_fields(self, field_type):
+        """
+        Returns the names of the mapped fields of a type
+        """
+        return [field['name'] for field in self.mappings if field['type']==field_type]
+
+    def _supports_statistics(self, layer):
+        """
+        Returns True if the layer can compute the statistics of `statistics`
+        """
+        try:
+            capabilities = layer.properties.advancedQueryCapabilities
+            return bool(capabilities.supportsStatistics and capabilities.supportsSqlExpression)
+        except (AttributeError, KeyError):
+            return False
+
+    def _group_counts(self, layer, group_by, where='1=1'):
+        """
+        Returns a Series of the number of features per value of a field or SQL
+        expression, counted by the layer. The groups are paged through with result
+        offsets if the layer supports it, else an exception is raised if they
+        exceed the maximum record count of the layer.
+        """
+        import pandas as pd
+        _properties = layer.properties
+        _oid = _properties.objectIdField
+        try:
+            page_size = int(_properties.maxRecordCount)
+        except (AttributeError, KeyError, TypeError):
+            page_size = 1000
+        try:
+            paging = bool(_properties.advancedQueryCapabilities.supportsPaginationOnAggregatedQueries)
+        except (AttributeError, KeyError):
+            paging = False
+        out_statistics = [{'statisticType': 'count', 'onStatisticField': _oid, 'outStatisticFieldName': 'feature_count'}]
+        counts = {}
+        offset = 0
+        while True:
+            _paging = {'result_offset': offset, 'result_record_count': page_size,
+                       'order_by_fields': group_by, 'return_all_records': False} if paging else {}
+            featureset = layer.query(where=where, return_geometry=False, group_by_fields_for_statistics=group_by,
+                                     out_statistics=out_statistics, **_paging)
+            features = featureset.features
+            for feature in features:
+                attributes = {key.lower(): value for key, value in feature.attributes.items()}
+                count = attributes.pop('feature_count')
+                #the remaining attribute is the group value, whatever its name
+                value = list(attributes.values())[0] if attributes else None
+                if value is not None:
+                    counts[value] = counts.get(value, 0) + count
+            if not paging:
+                #a full response may have been truncated by the layer
+                if len(features) >= page_size:
+                    raise Exception('More than %d groups for %s, the layer does not support paging them' % (page_size, group_by))
+                break
+            #a short page does not tell the groups are exhausted, an empty one does
+            if not features:
+                break
+            offset += len(features)
+        return pd.Series(counts, dtype='int64').sort_values(ascending=False)
+
+    def statistics(self, where='1=1'):
+        """
+        Returns summary statistics of the indicator data computed by the layer with
+        statistics queries, without transferring features.
+        =======================    =============================================================
+        **Argument**               **Description**
+        -----------------------    -------------------------------------------------------------
+        where                      Optional string. The where clause selecting the features.
+                                   Default is '1=1', all features.
+        =======================    =============================================================
+        :return:
+            A dictionary with the total number of features ('total'), the average of every
+            mapped integer field ('averages') and pandas Series of feature counts: per value
+            of every mapped integer field ('values') and string field ('categories'), and per
+            hour, weekday/weekend and month of every mapped date field ('hours', 'days',
+            'months').
+        .. code-block:: python
+            USAGE EXAMPLE: Count crashes per category on the server
+            stats = indicator1.statistics(where="year = 2019")
+            stats['total']
+            stats['categories']['crash_type']
+        """
+        import pandas as pd
+        layer = self.indicator_item.layers[0]
+        _oid = layer.properties.objectIdField
+        value_columnNames = self._mapped_fields('esriFieldTypeInteger')
+        #Total and averages in a single query
+        out_statistics = [{'statisticType': 'count', 'onStatisticField': _oid, 'outStatisticFieldName': 'feature_count'}]
+        for n, value in enumerate(value_columnNames):
+            out_statistics.append({'statisticType': 'avg', 'onStatisticField': value, 'outStatisticFieldName': 'avg_%d' % n})
+        featureset = layer.query(where=where, return_geometry=False, out_statistics=out_statistics)
+        attributes = {key.lower(): value for key, value in featureset.features[0].attributes.items()}
+        summary = {
+            'total': attributes['feature_count'],
+            'averages': {value: attributes.get('avg_%d' % n) for n, value in enumerate(value_columnNames)},
+            'values': {}, 'categories': {}, 'hours': {}, 'days': {}, 'months': {},
+        }
+        for value in value_columnNames:
+            summary['values'][value] = self._group_counts(layer, value, where)
+        for category in self._mapped_fields('esriFieldTypeString'):
+            summary['categories'][category] = self._group_counts(layer, category, where)
+        for date in self._mapped_fields('esriFieldTypeDate'):
+            summary['hours'][date] = self._group_counts(layer, 'EXTRACT(HOUR FROM %s)' % date, where)
+            summary['months'][date] = self._group_counts(layer, 'EXTRACT(MONTH FROM %s)' % date, where)
+            #Days are counted as yyyymmdd numbers, from which weekdays and weekends are derived
+            days = self._group_counts(layer, 'EXTRACT(YEAR FROM {0})*10000+EXTRACT(MONTH FROM {0})*100+EXTRACT(DAY FROM {0})'.format(date), where)
+            dates = pd.to_datetime(pd.Series(days.index, dtype='int64').astype(str), format='%Y%m%d')
+            summary['days'][date] = pd.Series(days.values).groupby(dates.dt.weekday.map(self._week_day).values).sum()
+        return summary
+
+    def _dataframe_summary(self):
+        """
+        Returns the summary statistics of `statistics` computed from the downloaded
+        indicator data.
+        """
+        indicator_df = self.data_sdf
+        summary = {'total': indicator_df.shape[0], 'averages': {}, 'values': {}, 'categories': {},
+                   'hours': {}, 'days': {}, 'months': {}}
+        for value in self._mapped_fields('esriFieldTypeInteger'):
+            summary['averages'][value] = indicator_df[value].mean()
+            summary['values'][value] = indicator_df[value].value_counts()
+        for category in self._mapped_fields('esriFieldTypeString'):
+            summary['categories'][category] = indicator_df[category].value_counts()
+        for datetime in self._mapped_fields('esriFieldTypeDate'):
+            profile = self._temporal_profile(datetime)
+            summary['hours'][datetime] = profile['hours']
+            summary['days'][datetime] = profile['days']
+            summary['months'][datetime] = profile['months']
+        return summary
+
+    def explore(self, subclass, display=True, server_statistics=True):
         """ Returns exploratory analyses (statistics, charts, map) for the indicator.
         =======================    =============================================================
         **Argument**               **Description**
@@ -272,6 +618,12 @@ class Indicator(OrderedDict):
         -----------------------    -------------------------------------------------------------
         display                    Optional boolean. Indicates if the infographics should be
                                    displayed inline or returned in a list. Default is True.
+        -----------------------    -------------------------------------------------------------
+        server_statistics          Optional boolean. If True, and the layer supports statistics
+                                   queries, the statistics are computed by the layer (see
+                                   `statistics`) instead of downloading the indicator data.
+                                   Errors of these queries are raised. If False, or the layer
+                                   does not support them, the data is downloaded. Default is True.
         =======================    =============================================================
         :return:
             List of generated analyses if `display=False` else displays results in the notebok.
@@ -280,52 +632,37 @@ class Indicator(OrderedDict):
         if subclass.lower() not in ['measure', 'place', 'boundary']:
             raise Exception("Indicator not of valid subclass")
 
+        #Compute the statistics on the server when the layer supports it, else from the downloaded data
+        if server_statistics and self._supports_statistics(self.indicator_item.layers[0]):
+            summary = self.statistics()
+        else:
+            summary = self._dataframe_summary()
+
         #Calculating total number of features
-        indicator_df = self.data_sdf
-        total = 'Total number of '+self.indicatorid+': '+str(indicator_df.shape[0])
+        total = 'Total number of '+self.indicatorid+': '+str(summary['total'])
         results.append(total)
-
-        #Getting column names
-        category_columnNames = [field['name'] for field in self.mappings if field['type']=='esriFieldTypeString']
-        date_columnNames = [field['name'] for field in self.mappings if field['type']=='esriFieldTypeDate']
-        value_columnNames = [field['name'] for field in self.mappings if field['type']=='esriFieldTypeInteger']
       
         #Call necessary charting methods for numerical variables
-        if value_columnNames:
-            for value in value_columnNames:
+        for value, counts in summary['values'].items():
             #Average of value field
-                results.append('Average number of '+value+ ' is: '+str(indicator_df[value].mean()))
-                self._histogram_chart(indicator_df, value)
+            results.append('Average number of '+value+ ' is: '+str(summary['averages'][value]))
+            self._histogram_chart(counts, value)
 
         #Call necessary charting methods for categorical variables
-        if category_columnNames:
-            for category in category_columnNames:
-                if len(indicator_df[category].unique()) < 7:
-                    self._pie_chart(indicator_df, category)
-                elif len(indicator_df[category].unique()) < 50:
-                    self._bar_chart(indicator_df, category)
+        for category, counts in summary['categories'].items():
+            if len(counts) < 7:
+                self._pie_chart(counts, category)
+            elif len(counts) < 50:
+                self._bar_chart(counts, category)
 
         #Call necessary charting methods for datetime variables
-        if date_columnNames:
-            for datetime in date_columnNames:
-                indicator_df['date'] = indicator_df[datetime].apply(self._format_date)
-                indicator_df['hour'] = indicator_df['date'].apply(self._hour)
-                #Line chart for hourly distribution
-                self._line_chart(indicator_df, 'hour')
-
-                indicator_df['date'] = pd.to_datetime(indicator_df['date']).dt.date
-                indicator_df['day_of_week'] = indicator_df['date'].apply(lambda x: x.weekday()) 
-                indicator_df['day'] = indicator_df['day_of_week'].apply(self._week_day)
-                #Pie chart for weekday-weekend distribution
-                self._pie_chart(indicator_df, 'day')
-
-                indicator_df['month'] = indicator_df['date'].apply(self._month)
-                try:
-                    indicator_df['month'] = indicator_df['month'].astype(int)
-                except:
-                    pass
-                #Histogram for monthly distribution
-                self._histogram_chart(indicator_df, 'month')
+        for datetime in summary['hours']:
+            #Line chart for hourly distribution
+            self._line_chart(summary['hours'][datetime], 'hour')
+            #Pie chart for weekday-weekend distribution
+            self._pie_chart(summary['days'][datetime], 'day')
+            #Histogram for monthly distribution
+            self._histogram_chart(summary['months'][datetime], 'month')
     
         #Map for this indicator
         indicator_map = self._gis.map()
@@ -373,9 +710,10 @@ class Indicator(OrderedDict):
         except:
             return 'Indicator properties must include id of indicator'
         if indicator_properties is not None:
-            self._initiativedata['indicators'] = [dict(indicator_properties) if indicator['id']==_indicatorId else indicator for indicator in self._initiativedata['indicators']]
-            _new_initiativedata = json.dumps(self._initiativedata)
-            status = self._initiativeItem.update(item_properties={'text': _new_initiativedata})      
+
+            def _replace(data):
+                data['indicators'] = [dict(indicator_properties) if indicator['id']==_indicatorId else indicator for indicator in data['indicators']]
+            status = self._data.update(_replace)
             if status:
                 self.definition = PropertyMap(indicator_properties)
                 return status
@@ -386,12 +724,22 @@ class IndicatorManager(object):
     call methods on this 'indicators' object to manipulate (add, get, search, etc) indicators of a particular
     initiative.
     """
-    def __init__(self, gis, initiativeItem):
+    def __init__(self, gis, initiativeItem, initiativeData=None):
         self._gis = gis
         self._hub = self._gis.hub
         self._initiativeItem = initiativeItem
-        self._initiativedata = self._initiativeItem.get_data()
-        self._indicators = self._initiativedata['indicators']
+        self._data = initiativeData if initiativeData is not None else _InitiativeData(initiativeItem)
+
+    @property
+    def _initiativedata(self):
+        """
+        Returns the latest data of the initiative, fetched on first access
+        """
+        return self._data.data
+
+    @property
+    def _indicators(self):
+        return self._initiativedata['indicators']
         
     def add(self, indicator_properties):
         """
@@ -421,48 +769,24 @@ class IndicatorManager(object):
             initiative1.indicators.add(indicator_properties = indicator1_data)
             >> True
         """
-        _stemplates = []
         _id = indicator_properties['id']
-        _added = False
         
-        #Fetch initiative template data
-        _itemplateid = self._initiativedata['source']
-        _itemplate =    self._gis.content.get(_itemplateid)
-        _itemplatedata = _itemplate.get_data()
-        
-        #Fetch solution templates associated with initiative template
-        for step in _itemplatedata['steps']:
-            for _stemplateid in step['templateIds']:
-                _stemplates.append(_stemplateid)
-        
-        #Fetch data for each solution template
-        for _stemplateid in _stemplates:
-            _stemplate =    self._gis.content.get(_stemplateid)
-            _stemplatedata = _stemplate.get_data()
-            
-            #Check if indicator exists in solution
-            for indicator in _stemplatedata['indicators']:
-                
-                #add indicator to initiative
-                if indicator['id']==_id:
-                    if self.get(_id) is not None:
-                        return 'Indicator already exists'
-                    else:
-                        self._initiativedata['indicators'].append(indicator_properties)
-                        _new_initiativedata = json.dumps(self._initiativedata)
-                        self._initiativeItem.update(item_properties={'text': _new_initiativedata})
-                        _added = True
-                        #Share indicator item with content (open data) group
-                        try:
-                            item = self._gis.content.get(indicator_properties['source']['itemId'])
-                            initiative = self._hub.initiatives.get(self._initiativeItem.id)
-                            content_group = self._gis.groups.get(initiative.content_group_id)
-                            item.share(groups=[content_group])
-                        except:
-                            pass
-                        return Indicator(self._gis, self._initiativeItem, indicator_properties)
-        if not _added:
+        #Check if indicator exists in the solution templates of the initiative template
+        _indicators = _solution_templates(self._gis).indicators(self._initiativedata['source'])
+        if _id not in _indicators:
             return 'Invalid indicator id for this initiative'
+        if self.get(_id) is not None:
+            return 'Indicator already exists'
+        #add indicator to initiative
+        self._data.update(lambda data: data['indicators'].append(indicator_properties))
+        #Share indicator item with content (open data) group
+        try:
+            item = self._gis.content.get(indicator_properties['source']['itemId'])
+            content_group = self._gis.groups.get(self._initiativeItem.properties['contentGroupId'])
+            item.share(groups=[content_group])
+        except:
+            pass
+        return Indicator(self._gis, self._initiativeItem, indicator_properties, self._data)
     
     def get(self, indicator_id):
         """ Returns the indicator object for the specified indicator_id.
@@ -478,7 +802,7 @@ class IndicatorManager(object):
             if indicator['id']==indicator_id:
                 _indicator = indicator
         try:
-            return Indicator(self._gis, self._initiativeItem, _indicator)
+            return Indicator(self._gis, self._initiativeItem, _indicator, self._data)
         except:
             return None
     
@@ -508,5 +832,5 @@ class IndicatorManager(object):
         if name!=None:
             _indicators = [indicator for indicator in _indicators if indicator['source']['name']==name]
         for indicator in _indicators:
-            indicatorlist.append(Indicator(self._gis, self._initiativeItem, indicator))
+            indicatorlist.append(Indicator(self._gis, self._initiativeItem, indicator, self._data))
         return indicatorlist
\ No newline at end of file
@@ -1,9 +1,11 @@
 from arcgis.gis import GIS
 from arcgis._impl.common._mixins import PropertyMap
 from arcgishub.sites import Site, SiteManager
-from arcgishub.indicators import Indicator, IndicatorManager
+from arcgishub.indicators import Indicator, IndicatorManager, _InitiativeData
+from arcgishub._utils import _add_to_content_group, _prefetch_definitions, _search_pages, _transfer_items
 from collections import OrderedDict
 from datetime import datetime
+import copy
 import json
 
 def _lazy_property(fn):
@@ -25,22 +27,69 @@ class Initiative(OrderedDict):
     policy- or activity-oriented goals through workflows, tools and team collaboration.
     """
     
-    def __init__(self, hub, initiativeItem):
+    def __init__(self, hub, initiativeItem, prefetch=False):
         """
-        Constructs an empty Initiative object
+        Constructs an empty Initiative object. The initiative definition is 
+        fetched on first access unless `prefetch` is True.
         """
         self.item = initiativeItem
         self._hub = hub
         self._gis = self._hub.gis
-        try:
-            self._initiativedict = self.item.get_data()
-            pmap = PropertyMap(self._initiativedict)
-            self.definition = pmap
-        except:
-            self.definition = None
+        #initiative data shared with the indicators of the initiative
+        self._data = _InitiativeData(initiativeItem)
+        self._definition = None
+        self._definition_loaded = False
+        self._definition_version = None
+        self.definition_error = None
+        if prefetch:
+            self._load_definition()
             
     def __repr__(self):
         return '<%s title:"%s" owner:%s>' % (type(self).__name__, self.title, self.owner)
+
+    def _load_definition(self):
+        """
+        Fetches the initiative data and builds the definition from it
+        """
+        try:
+            self._build_definition(self._data.data)
+            self.definition_error = None
+        except Exception as e:
+            self.definition = None
+            self.definition_error = e
+
+    def _set_definition(self, data):
+        """
+        Builds the initiative definition from already fetched initiative data
+        """
+        self._data.set(data)
+        self._build_definition(data)
+
+    def _build_definition(self, data):
+        #a copy, so that edits of the definition do not leak into the data
+        #the indicators write back to the item
+        self._initiativedict = copy.deepcopy(data)
+        self.definition = PropertyMap(self._initiativedict)
+        self._definition_version = self._data.version
+
+    @property
+    def definition(self):
+        """
+        Getter/Setter for the initiative definition (the data of the initiative item).
+        The data is fetched on first access, and the definition is rebuilt when the
+        indicators of the initiative have changed the data.
+        """
+        if not self._definition_loaded:
+            self._load_definition()
+        elif self._definition_version is not None and self._definition_version != self._data.version:
+            self._build_definition(self._data.data)
+        return self._definition
+
+    @definition.setter
+    def definition(self, value):
+        self._definition = value
+        self._definition_loaded = True
+        self._definition_version = None
        
     @property
     def itemid(self):
@@ -106,7 +155,7 @@ class Initiative(OrderedDict):
         try:
             return self.item.properties['siteId']
         except:
-            return self._initiativedict['steps'][0]['itemIds'][0]
+            return self.definition['steps'][0]['itemIds'][0]
 
     @property
     def site_url(self):
@@ -156,7 +205,7 @@ class Initiative(OrderedDict):
         The resource manager for an Initiative's indicators. 
         See :class:`~hub.hub.IndicatorManager`.
         """
-        return IndicatorManager(self._gis, self.item)
+        return IndicatorManager(self._gis, self.item, self._data)
 
     @_lazy_property
     def sites(self):
@@ -181,34 +230,35 @@ class Initiative(OrderedDict):
         _followers_group = self._gis.groups.get(self.followers_group_id)
         return _followers_group.get_members()
 
-    def add_content(self, items_list):
+    def add_content(self, items_list, max_workers=8):
         """
-        Adds a batch of items to the initiative content library.
-        
+        Adds a batch of items to the initiative content library. The existing sharing of
+        every item is kept. Item ids are resolved in batches and items of the current
+        user with the same access level are shared together. Items owned by other
+        users are shared one by one. None elements are skipped.
+
         =====================     ====================================================================
         **Argument**              **Description**
         ---------------------     --------------------------------------------------------------------
-        items_list                Required list. A list of Item or item ids to add to the initiative
+        items_list                Required list. A list of Item or item ids to add to the initiative.
+        ---------------------     --------------------------------------------------------------------
+        max_workers               Optional integer. The maximum number of concurrent requests.
+                                  Default is 8.
         =====================     ====================================================================
+
+        :return:
+           A dictionary with a `results` list holding, for every item of items_list in
+           order, its `itemId`, `success` and `notSharedWith`, and an `error` message
+           for the items that could not be added.
+
+        .. code-block:: python
+
+            USAGE EXAMPLE: Add datasets to the content library
+
+            status = myInitiative.add_content(['itemId1', 'itemId2'])
+            failed = [r['itemId'] for r in status['results'] if not r['success']]
         """
-        # If input list is of item_ids, generate a list of corresponding items
-        if type(items_list[0]) == str:
-            items = [self._gis.content.get(item_id) for item_id in items_list]
-        else:
-            items = items_list
-        # Fetch existing sharing privileges for each item, to retain them after adding to content library
-        for item in items:
-            sharing = item.shared_with
-            everyone = sharing["everyone"]
-            org = sharing["org"]
-            groups = sharing["groups"]
-            # add current initiative's content group to list of groups to share to
-            groups.append(self.content_group_id)
-            # share item to this group
-            status = item.share(everyone=everyone, org=org, groups=groups)
-            if status["results"][0]["success"] == False:
-                return status
-        return status
+        return _add_to_content_group(self._gis, items_list, self.content_group_id, max_workers=max_workers)
 
     def delete(self):
         """
@@ -255,7 +305,7 @@ class Initiative(OrderedDict):
             # Delete initiative
             return self.item.delete()
 
-    def reassign_to(self, target_owner):
+    def reassign_to(self, target_owner, max_workers=8, progress=None):
         """
         
         Allows the administrator to reassign the initiative object from one 
@@ -269,40 +319,42 @@ class Initiative(OrderedDict):
         **Argument**              **Description**
         ---------------------     --------------------------------------------------------------------
         target_owner              Required string. The new desired owner of the initiative.
+        ---------------------     --------------------------------------------------------------------
+        max_workers               Optional integer. The maximum number of items reassigned
+                                  concurrently. Default is 8.
+        ---------------------     --------------------------------------------------------------------
+        progress                  Optional callable. Called with the number of items reassigned so
+                                  far and the total number of items, as each item is reassigned.
         =====================     ====================================================================
+
+        :return:
+           The initiative item. Raises an exception listing the items that could not be
+           transferred, once all the other items and groups have been transferred.
         """
         #check if admin user is performing this action
         if 'admin' not in self._gis.users.me.role:
             return Exception("You do not have the administrator privileges to perform this action.")
+        errors = {}
         #check if core team is needed by checking the role of the target_owner
         if self._gis.users.get(target_owner).role=='org_admin':
             #check if the initiative comes with core team by checking owner's role
             if self._gis.users.get(self.owner).role=='org_admin':
                 #fetch the core team for the initative 
                 core_team = self._gis.groups.get(self.collab_group_id)
-                #fetch the contents shared with this team
-                core_team_content = core_team.content()
+                #fetch the contents shared with this team, up to the portal search limit
+                core_team_content = core_team.content(max_items=10000)
                 #check if target_owner is part of core team, else add them to core team
                 members = core_team.get_members()
-                if target_owner not in members['admins'] or target_owner not in members['users']:
+                if target_owner not in members['admins'] and target_owner not in members['users']:
                     core_team.add_users(target_owner)
-                #remove items from core team 
-                self._gis.content.unshare_items(core_team_content, groups=[core_team])
-                #reassign to target_owner
-                for item in core_team_content:
-                    item.reassign_to(target_owner)
-                #fetch the items again since they have been reassigned
-                new_content_list = []
-                for item in core_team_content:
-                    item_temp = self._gis.content.get(item.id)
-                    new_content_list.append(item_temp)
-                #share item back to the content group
-                self._gis.content.share_items(new_content_list, groups=[core_team], allow_members_to_edit=True)
+                #unshare, reassign to target_owner and share back the content of the core team
+                errors = _transfer_items(self._gis, core_team_content, target_owner, group=core_team,
+                                         max_workers=max_workers, progress=progress)
                 #reassign core team to target owner
                 core_team.reassign_to(target_owner)
             else:
                 #create core team necessary for the initiative
-                _collab_group_title = title + ' Core Team'
+                _collab_group_title = self.title + ' Core Team'
                 _collab_group_dict = {
                     "title": _collab_group_title, 
                     "tags": ["Hub Group", "Hub Initiative Group", "Hub Site Group", "Hub Core Team Group", "Hub Team Group"], 
@@ -316,15 +368,9 @@ class Initiative(OrderedDict):
                 self.collab_group_id = collab_group.id
         else:
             #reassign the initiative, site, page items
-            self.item.reassign_to(target_owner)
             site = self._hub.sites.get(self.site_id)
-            site.item.reassign_to(target_owner)
-            site_pages = site.pages.search()
-            #If pages exist
-            if len(site_pages) > 0:
-                for page in site_pages:
-                    #Unlink page (deletes if)
-                    page.item.reassign_to(target_owner)
+            initiative_items = [self.item, site.item] + [page.item for page in site.pages.search()]
+            errors = _transfer_items(self._gis, initiative_items, target_owner, max_workers=max_workers, progress=progress)
         #fetch content group
         content_team = self._gis.groups.get(self.content_group_id)
         #reassign to target_owner
@@ -333,6 +379,9 @@ class Initiative(OrderedDict):
         if self._hub._hub_enabled:
             followers_team = self._gis.groups.get(self.followers_group_id)
             followers_team.reassign_to(target_owner)
+        if errors:
+            raise Exception('Unable to transfer %d of the items to %s: %s' % (
+                len(errors), target_owner, ', '.join('%s (%s)' % (itemid, error) for itemid, error in errors.items())))
         return self._gis.content.get(self.itemid)
 
     def share(self, everyone=False, org=False, groups=None, allow_members_to_edit=False):
@@ -655,9 +704,33 @@ class InitiativeManager(object):
         else:
             raise TypeError("Item is not a valid initiative or is inaccessible.")
     
-    def search(self, title=None, owner=None, created=None, modified=None, tags=None):
+    def prefetch(self, initiatives, max_workers=8):
+        """
+        Fetches the definitions of a list of initiatives concurrently, so that later access
+        to their `definition` does not issue a request per initiative.
+
+        ===============     ====================================================================
+        **Argument**        **Description**
+        ---------------     --------------------------------------------------------------------
+        initiatives         Required list of Initiative objects.
+        ---------------     --------------------------------------------------------------------
+        max_workers         Optional integer. The maximum number of concurrent requests.
+                            Default is 8.
+        ===============     ====================================================================
+
+        :return:
+           A dictionary of itemid to the error raised for every initiative whose definition
+           could not be fetched. Empty if all definitions were fetched.
+           The error is also kept in the `definition_error` of the initiative.
+        """
+        return _prefetch_definitions(initiatives, max_workers=max_workers)
+
+    def iter_search(self, title=None, owner=None, created=None, modified=None, tags=None, page_size=100, prefetch=False, max_workers=8):
         """ 
-        Searches for initiatives.
+        Searches for initiatives, yielding them page by page as the search results arrive.
+        Unlike `search`, the results are not held in memory. The portal search returns
+        at most the first 10,000 results of a query, as it rejects a start beyond 10,000;
+        narrow the query (e.g. by `created` or `modified`) to go through more.
         ===============     ====================================================================
         **Argument**        **Description**
         ---------------     --------------------------------------------------------------------
@@ -672,13 +745,22 @@ class InitiativeManager(object):
                             Shown in milliseconds since UNIX epoch
         ---------------     --------------------------------------------------------------------
         tags                Optional string. User-defined tags that describe the initiative.
+        ---------------     --------------------------------------------------------------------
+        page_size           Optional integer. The number of initiatives fetched per search 
+                            request. Default and maximum is 100.
+        ---------------     --------------------------------------------------------------------
+        prefetch            Optional boolean. If True, the definitions of the initiatives in 
+                            each page are fetched concurrently before the page is yielded. 
+                            Default is False, the definition is fetched on first access.
+                            The error of a definition that could not be fetched is kept in
+                            the `definition_error` of the initiative, whose definition is None.
+        ---------------     --------------------------------------------------------------------
+        max_workers         Optional integer. The maximum number of concurrent requests used
+                            when prefetching. Default is 8.
         ===============     ====================================================================
         :return:
-           A list of matching initiatives.
+           A generator of matching initiatives.
         """
-
-        initiativelist = []
-        
         #Build search query
         query = 'typekeywords:hubInitiative'
         if title!=None:
@@ -692,10 +774,43 @@ class InitiativeManager(object):
         if tags!=None:
             query += ' AND tags:'+tags
 
-        #Search
-        items = self._gis.content.search(query=query, max_items=5000)
-            
-        #Return searched initiat    ives
-        for item in items:
-            initiativelist.append(Initiative(self._hub, item))
-        return initiativelist
+        #Search, one page at a time
+        for items in _search_pages(self._gis, query, page_size):
+            initiativelist = [Initiative(self._hub, item) for item in items]
+            if prefetch:
+                self.prefetch(initiativelist, max_workers=max_workers)
+            for initiative in initiativelist:
+                yield initiative
+
+    def search(self, title=None, owner=None, created=None, modified=None, tags=None, prefetch=False, max_workers=8):
+        """ 
+        Searches for initiatives.
+        ===============     ====================================================================
+        **Argument**        **Description**
+        ---------------     --------------------------------------------------------------------
+        title               Optional string. Return initiatives with provided string in title.
+        ---------------     --------------------------------------------------------------------
+        owner               Optional string. Return initiatives owned by a username.
+        ---------------     --------------------------------------------------------------------
+        created             Optional string. Date the initiative was created.
+                            Shown in milliseconds since UNIX epoch.
+        ---------------     --------------------------------------------------------------------
+        modified            Optional string. Date the initiative was last modified.
+                            Shown in milliseconds since UNIX epoch
+        ---------------     --------------------------------------------------------------------
+        tags                Optional string. User-defined tags that describe the initiative.
+        ---------------     --------------------------------------------------------------------
+        prefetch            Optional boolean. If True, the definitions of all matching initiatives
+                            are fetched up front, concurrently. Default is False, the 
+                            definition is fetched on first access.
+                            The error of a definition that could not be fetched is kept in
+                            the `definition_error` of the initiative, whose definition is None.
+        ---------------     --------------------------------------------------------------------
+        max_workers         Optional integer. The maximum number of concurrent requests used
+                            when prefetching. Default is 8.
+        ===============     ====================================================================
+        :return:
+           A list of matching initiatives.
+        """
+
+        return list(self.iter_search(title=title, owner=owner, created=created, modified=modified, tags=tags, prefetch=prefetch, max_workers=max_workers))
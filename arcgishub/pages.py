@@ -1,6 +1,7 @@
 from arcgis.gis import GIS
 from arcgis._impl.common._mixins import PropertyMap
 from arcgis._impl.common._isd import InsensitiveDict
+from arcgishub._utils import _active_batch, _changed_paths, _changed_properties, _fingerprint, _iter_items, _pending_definition, _prefetch_definitions, _run_concurrently, _save_definition, _search_pages, _write_definition
 from datetime import datetime
 from collections import OrderedDict
 import json
@@ -12,18 +13,20 @@ class Page(OrderedDict):
     content that can be rendered within the context of a Site
     """
     
-    def __init__(self, gis, pageItem):
+    def __init__(self, gis, pageItem, prefetch=False):
         """
-        Constructs an empty Page object
+        Constructs an empty Page object. The page definition is fetched
+        on first access unless `prefetch` is True.
         """
         self.item = pageItem
         self._gis = gis
-        try:
-            self._pagedict = self.item.get_data()
-            pmap = PropertyMap(self._pagedict)
-            self.definition = pmap
-        except:
-            self.definition = None
+        self._definition = None
+        self._definition_loaded = False
+        self._baseline = None
+        self.updated_paths = []
+        self.definition_error = None
+        if prefetch:
+            self._load_definition()
             
     def __repr__(self):
         return '<%s title:"%s" owner:%s>' % (
@@ -31,6 +34,54 @@ class Page(OrderedDict):
             self.item.title, 
             self.item.owner
         )
+
+    def _load_definition(self):
+        """
+        Fetches the page data and builds the definition from it
+        """
+        #share the definition edited in the open batch, if any
+        definition = _pending_definition(self)
+        if definition is not None:
+            self.definition = definition
+            return
+        try:
+            self._set_definition(self.item.get_data())
+            self.definition_error = None
+        except Exception as e:
+            self.definition = None
+            self.definition_error = e
+
+    def _set_definition(self, data):
+        """
+        Builds the page definition from already fetched page data
+        """
+        self._pagedict = data
+        self.definition = PropertyMap(self._pagedict)
+        self._baseline = _fingerprint(self.definition)
+
+    @property
+    def definition(self):
+        """
+        Getter/Setter for the page definition (the data of the page item).
+        The data is fetched on first access.
+        """
+        if not self._definition_loaded:
+            self._load_definition()
+        return self._definition
+
+    @definition.setter
+    def definition(self, value):
+        self._definition = value
+        self._definition_loaded = True
+
+    @property
+    def changed_paths(self):
+        """
+        Returns the paths of the page definition (e.g. `values.layout`) that changed
+        since the definition was fetched or last written. `updated_paths` holds
+        the paths written by the last update.
+        """
+        return _changed_paths(self._baseline, self.definition)
     
     @property
     def itemid(self):
@@ -97,6 +148,8 @@ class Page(OrderedDict):
             For page_properties, pass in arguments for only the properties you want to be updated.
             All other properties will be untouched.  For example, if you want to update only the
             page's description, then only provide the description argument in page_properties.
+            page_properties only updates the page item; it is no longer merged into the page definition.
+            Within `hub.batch()` the page item and its sites are written when the batch exits.
         
         =====================     ====================================================================
         **Argument**              **Description**
@@ -110,7 +163,9 @@ class Page(OrderedDict):
         https://esri.github.io/arcgis-python-api/apidoc/html/arcgis.gis.toc.html#arcgis.gis.Item.update
         
         :return:
-           A boolean indicating success (True) or failure (False).
+           A boolean indicating success (True) or failure (False). Nothing is sent,
+           and True returned, if the update changes nothing. The changed paths
+           are recorded in `updated_paths`.
         
         .. code-block:: python
             
@@ -121,10 +176,7 @@ class Page(OrderedDict):
             
             >> True
         """
-        _page_data = self.definition
-        if page_properties:
-            for key, value in page_properties.items():
-                _page_data[key] = value
+        _page_properties = dict(page_properties or {})
         if slug:
             #Fetch all the sites this page is connected to
             linked_sites = self.definition['values']['sites']
@@ -143,10 +195,20 @@ class Page(OrderedDict):
                 _renamed_page['title'] = slug
                 _renamed_page['slug'] = slug
                 definition['values']['pages'].append(_renamed_page)
-                site.item.update(item_properties={'text': definition})
+                _write_definition(site)
             #Update the slug on the page
-            _page_data['title'] = slug
-        return self.item.update(_page_data)
+            _page_properties['title'] = slug
+        #Only the item properties that differ from the page item are sent
+        _changed = _changed_properties(self.item, _page_properties)
+        self.updated_paths = sorted(_changed)
+        if not _changed:
+            return True
+        #Within a batch the page item is written with the sites when the batch exits
+        batch = _active_batch(self._gis)
+        if batch is not None:
+            batch._record(self, _changed)
+            return True
+        return self.item.update(item_properties=_changed)
 
     def update_layout(self, layout):
         """ Updates the layout of the page.
@@ -156,7 +218,9 @@ class Page(OrderedDict):
         layout                    Required dictionary. The new layout dictionary to update to the page.
         =====================     ====================================================================
         :return:
-           A boolean indicating success (True) or failure (False).
+           A boolean indicating success (True) or failure (False). Nothing is sent,
+           and True returned, if the update changes nothing. The changed paths
+           are recorded in `updated_paths`.
         .. code-block:: python
             USAGE EXAMPLE: Update a site successfully
             page1 = myHub.pages.get('itemId12345')
@@ -165,14 +229,18 @@ class Page(OrderedDict):
             page1.update_layout(layout = page_layout)
             >> True
         """
+        self.definition['values']['layout'] = layout._json()
+        #Nothing to publish if the layout did not change
+        if not self.changed_paths:
+            self.updated_paths = []
+            return True
         #Deleting the draft file for this site, if exists
         resources = self.item.resources.list()
         for resource in resources:
             if "draft-" in resource["resource"]:
                 self.item.resources.remove(file=resource["resource"])
-        #Update the data of the site
-        self.definition['values']['layout'] = layout._json()
-        return self.item.update(item_properties={'text': self.definition})
+        #Update the data of the page
+        return _save_definition(self)
  
     def delete(self):
         """
@@ -193,14 +261,17 @@ class Page(OrderedDict):
         #Unlink sites
         linked_sites = self.definition['values']['sites']
         for item in linked_sites:
-            site_item = self._gis.content.get(item['id'])
             if self._gis._portal.is_arcgisonline:
                 site = self._gis.hub.sites.get(item["id"])
             else:
                 site = self._gis.sites.get(item["id"])
             definition = site.definition
             definition['values']['pages'] = [p for p in definition['values']['pages'] if p['id']!=self.itemid]
-            site_item.update(item_properties={'text': definition})
+            _write_definition(site)
+        #Drop pending edits of the page in the open batch
+        batch = _active_batch(self._gis)
+        if batch is not None:
+            batch._forget(self.itemid)
         #Remove delete protection on page
         self.item.protect(enable=False)
         #Delete page item
@@ -261,27 +332,8 @@ class PageManager(object):
         except:
             collab_group = None
     
-        #For pages in ArcGIS Online
-        if self._gis._portal.is_arcgisonline:
-            #Set item details
-            item_type = "Hub Page"
-            typekeywords = "Hub, hubPage, JavaScript, Map, Mapping Site, Online Map, OpenData, selfConfigured, Web Map"
-            description = "DO NOT DELETE OR MODIFY THIS ITEM. This item is managed by the ArcGIS Hub application. To make changes to this site, please visit https://hub.arcgis.com/overview/edit"
-            image_card_url = 'https://cloud.githubusercontent.com/assets/7389593/20107607/1d2c3844-a5a7-11e6-9ec0-9e389033ccd8.jpg'
-        #For Enterprise Sites
-        else:
-            item_type = "Site Page"
-            typekeywords = "Hub, hubPage, JavaScript, Map, Mapping Site, Online Map, OpenData, selfConfigured, Web Map"
-            description = "DO NOT DELETE OR MODIFY THIS ITEM. This item is managed by the ArcGIS Enterprise Sites application. To make changes to this site, please visit" + self._gis.url +"/apps/sites/#/home/overview/edit/"
-            image_card_url = self._gis.url +'/apps/sites/images/placeholders/page-editor-card-image-placeholder.jpg'
         #Create page item
-        _item_dict = {
-                    "title":title,
-                    "type": item_type,
-                    "typeKeywords": typekeywords,
-                    "description": description,
-                    "culture": self._gis.properties.user.culture
-                    }
+        _item_dict, image_card_url = self._page_item_properties(title)
         item =  self._gis.content.add(_item_dict, owner=self._gis.users.me.username)
         
         #share page with content and core team groups
@@ -307,6 +359,64 @@ class PageManager(object):
         if status:
             return page
 
+    def _page_item_properties(self, title):
+        """
+        Returns the item properties of a new page item and the url of the
+        image card placeholder for this portal.
+        """
+        #For pages in ArcGIS Online
+        if self._gis._portal.is_arcgisonline:
+            #Set item details
+            item_type = "Hub Page"
+            typekeywords = "Hub, hubPage, JavaScript, Map, Mapping Site, Online Map, OpenData, selfConfigured, Web Map"
+            description = "DO NOT DELETE OR MODIFY THIS ITEM. This item is managed by the ArcGIS Hub application. To make changes to this site, please visit https://hub.arcgis.com/overview/edit"
+            image_card_url = 'https://cloud.githubusercontent.com/assets/7389593/20107607/1d2c3844-a5a7-11e6-9ec0-9e389033ccd8.jpg'
+        #For Enterprise Sites
+        else:
+            item_type = "Site Page"
+            typekeywords = "Hub, hubPage, JavaScript, Map, Mapping Site, Online Map, OpenData, selfConfigured, Web Map"
+            description = "DO NOT DELETE OR MODIFY THIS ITEM. This item is managed by the ArcGIS Enterprise Sites application. To make changes to this site, please visit" + self._gis.url +"/apps/sites/#/home/overview/edit/"
+            image_card_url = self._gis.url +'/apps/sites/images/placeholders/page-editor-card-image-placeholder.jpg'
+        _item_dict = {
+                    "title":title,
+                    "type": item_type,
+                    "typeKeywords": typekeywords,
+                    "description": description,
+                    "culture": self._gis.properties.user.culture
+                    }
+        return _item_dict, image_card_url
+
+    def _create_clone(self, page, site, collab_group=None):
+        """
+        Creates a copy of the page linked to the site, with its final definition,
+        in a single add call. The page is shared with the collab group and protected.
+        The site definition is left to the caller to update.
+        """
+        from datetime import timezone
+        now = datetime.now(timezone.utc)
+        title = page.title + "-copy-%s" % int(now.timestamp() * 1000)
+        _item_dict, image_card_url = self._page_item_properties(title)
+        #Build the final page data: template, layout of the page, link to the site
+        data_path = os.path.abspath(os.path.join(os.path.dirname(__file__), '_store/pages-data.json'))
+        with open(data_path) as f:
+            _page_data = json.load(f)
+        _page_data['values']['layout'] = page.definition['values']['layout']
+        _page_data['values']['updatedBy'] = self._gis.users.me.username
+        _page_data['values']['sites'] = [{'id': site.itemid, 'title': site.title}]
+        _item_dict['text'] = json.dumps(_page_data)
+        item = self._gis.content.add(_item_dict, owner=self._gis.users.me.username)
+        #share page with core team group and protect it from accidental deletion, concurrently
+        _calls = [lambda: item.protect(enable=True)]
+        if collab_group:
+            _calls.append(lambda: item.share(groups=[collab_group]))
+        for call, result, error in _run_concurrently(lambda call: call(), _calls):
+            if error is not None:
+                raise error
+        _page = Page(self._gis, item)
+        #a copy, so that the definitions of the two pages do not share the layout
+        _page._set_definition(json.loads(_item_dict['text']))
+        return _page
+
     def clone(self, page, site=None):
         """
         Clone allows for the creation of a page that is derived from the current page.
@@ -322,10 +432,6 @@ class PageManager(object):
         :return:
            Page.
         """
-        from datetime import timezone
-        now = datetime.now(timezone.utc)
-        #New title
-        title = page.title + "-copy-%s" % int(now.timestamp() * 1000)
         #Checking if item of correct type has been passed 
         if 'hubPage' not in page.item.typeKeywords:
             raise Exception("Incorrect item type. Page item needed for cloning.")
@@ -336,13 +442,17 @@ class PageManager(object):
         #If called from a specified site
         if self._site is not None:
             site = self._site
-        #Create new page within site
-        _cloned_page = site.pages.add(title)
-        #Copy the page layout
-        _cloned_page.definition['values']['layout'] = page.definition['values']['layout']
-        #_data = json.dumps(_cloned_page.definition)
-        _cloned_page.item.update(item_properties={'text': _cloned_page.definition})
-        return Page(self._gis, _cloned_page.item)
+        #Fetch site collab group if exists
+        try:
+            collab_group = self._gis.groups.get(site.collab_group_id)
+        except:
+            collab_group = None
+        #Create the page with its final definition, already linked to the site
+        _cloned_page = self._create_clone(page, site, collab_group)
+        #Link the site to the page
+        site.definition['values']['pages'].append({'id': _cloned_page.itemid, 'title': _cloned_page.title, 'slug': _cloned_page.slug})
+        _write_definition(site)
+        return _cloned_page
         
     def get(self, page_id):
         """ 
@@ -427,8 +537,8 @@ class PageManager(object):
         _new_site['title'] = site.title
         _page_data['values']['sites'].append(_new_site)
         #Update page and site data with new linking
-        page.item.update(item_properties={'text': _page_data})
-        return site.item.update(item_properties={'text': _site_data})
+        _write_definition(page)
+        return _write_definition(site)
 
     def unlink(self, page, site=None):
         """ 
@@ -481,13 +591,120 @@ class PageManager(object):
             page.delete()
         #Update page data to reflect unlinking
         else:
-            page.item.update(item_properties={'text': _page_data})
+            _write_definition(page)
         #Update site data to reflect unlinking
-        return site.item.update(item_properties={'text': _site_data})
+        return _write_definition(site)
 
-    def search(self, title=None, owner=None, created=None, modified=None, tags=None):
+    def unlink_many(self, pages, site=None, max_workers=8):
         """ 
-        Searches for pages.
+        Unlinks a list of pages from the specific site in one batch. The page
+        definitions are fetched concurrently, pages left without any linked site
+        are deleted and the others updated concurrently, and the site definition
+        is written once for all of them.
+        
+        =======================    =============================================================
+        **Argument**               **Description**
+        -----------------------    -------------------------------------------------------------
+        pages                      Required list of Page objects to unlink.
+        -----------------------    -------------------------------------------------------------
+        site                       Optional Site object. The site to unlink the pages from.
+        -----------------------    -------------------------------------------------------------
+        max_workers                Optional integer. The maximum number of concurrent requests.
+                                   Default is 8.
+        =======================    =============================================================
+        
+        :return:
+            A dictionary of itemid to the error raised for every page that could not be 
+            unlinked. These pages stay linked to the site. Empty if all pages were unlinked.
+        
+        .. code-block:: python
+        
+            USAGE EXAMPLE: Unlink all pages of a site
+        
+            site_pages = mySite.pages.search()
+            mySite.pages.unlink_many(site_pages)
+        
+            >> {}
+        """
+        #If site object is not provided
+        if site is None:
+            if self._site is None:
+                raise Exception('Site object needed for unlinking pages')
+        #Checking if items of correct type have been passed 
+        for page in pages:
+            if 'hubPage' not in page.item.typeKeywords:
+                raise Exception("Incorrect item type. Page item needed for unlinking.")
+        #If called from a specified site
+        if self._site is not None:
+            site = self._site
+        _site_data = site.definition
+        errors = self.prefetch(pages, max_workers=max_workers)
+        pending = [page for page in pages if page.itemid not in errors]
+
+        def _unlink(page):
+            _page_data = page.definition
+            _page_data['values']['sites'] = [s for s in _page_data['values']['sites'] if s['id']!=site.itemid]
+            #Delete page if it has no other site linkage
+            if len(_page_data['values']['sites'])==0:
+                return page.delete()
+            #Update page data to reflect unlinking
+            return _write_definition(page)
+
+        for page, result, error in _run_concurrently(_unlink, pending, max_workers):
+            if error is not None:
+                errors[page.itemid] = error
+        #Update site data once to reflect all unlinking
+        unlinked = set(page.itemid for page in pages) - set(errors)
+        if unlinked:
+            _site_data['values']['pages'] = [p for p in _site_data['values']['pages'] if p['id'] not in unlinked]
+            _write_definition(site)
+        return errors
+
+    def prefetch(self, pages, max_workers=8):
+        """
+        Fetches the definitions of a list of pages concurrently, so that later access
+        to their `definition` does not issue a request per page.
+
+        ===============     ====================================================================
+        **Argument**        **Description**
+        ---------------     --------------------------------------------------------------------
+        pages               Required list of Page objects.
+        ---------------     --------------------------------------------------------------------
+        max_workers         Optional integer. The maximum number of concurrent requests.
+                            Default is 8.
+        ===============     ====================================================================
+
+        :return:
+           A dictionary of itemid to the error raised for every page whose definition
+           could not be fetched. Empty if all definitions were fetched.
+           The error is also kept in the `definition_error` of the page.
+        """
+        return _prefetch_definitions(pages, max_workers=max_workers)
+
+    def _linked_page_items(self, page_size=100, max_workers=8):
+        """
+        Yields the items of the pages linked to the site, in the order of the site
+        definition, page_size at a time. The items are resolved with batched id
+        searches, running concurrently, and yielded as soon as they resolve.
+        """
+        page_ids = [page["id"] for page in self._site.definition["values"]["pages"]]
+        items = []
+        # pages the user doesn't have access to are skipped
+        for found in _iter_items(self._gis, page_ids, max_workers):
+            items.extend(found.values())
+            while len(items) >= page_size:
+                yield items[:page_size]
+                items = items[page_size:]
+        if items:
+            yield items
+
+    def iter_search(self, title=None, owner=None, created=None, modified=None, tags=None, page_size=100, prefetch=False, max_workers=8):
+        """ 
+        Searches for pages, yielding them page by page as the search results arrive.
+        Unlike `search`, the results are not held in memory. The portal search returns
+        at most the first 10,000 results of a query, as it rejects a start beyond 10,000;
+        narrow the query (e.g. by `created` or `modified`) to go through more. Pages
+        linked to a site are not searched and have no such limit.
         
         ===============     ====================================================================
         **Argument**        **Description**
@@ -503,23 +720,26 @@ class PageManager(object):
                             Shown in milliseconds since UNIX epoch
         ---------------     --------------------------------------------------------------------
         tags                Optional string. User-defined tags that describe the page.
+        ---------------     --------------------------------------------------------------------
+        page_size           Optional integer. The number of pages fetched per search request.
+                            Default and maximum is 100.
+        ---------------     --------------------------------------------------------------------
+        prefetch            Optional boolean. If True, the definitions of the pages in each 
+                            batch are fetched concurrently before the batch is yielded. 
+                            Default is False, the definition is fetched on first access.
+                            The error of a definition that could not be fetched is kept in
+                            the `definition_error` of the page, whose definition is None.
+        ---------------     --------------------------------------------------------------------
+        max_workers         Optional integer. The maximum number of concurrent requests used
+                            when resolving the pages of a site and when prefetching.
+                            Default is 8.
         ===============     ====================================================================
         
         :return:
-           A list of matching pages.
+           A generator of matching pages.
         """
-
-        pagelist = []
-
         if self._site is not None:
-            pages = self._site.definition["values"]["pages"]
-            items = []
-            for page in pages:
-                try:
-                    items.append(self._gis.content.get(page["id"]))
-                except:
-                    # user doesn't have access to a particular page, skip it
-                    pass
+            item_pages = self._linked_page_items(page_size, max_workers)
         #Build search query
         else:
             query = 'typekeywords:hubPage'
@@ -533,11 +753,48 @@ class PageManager(object):
                 query += ' AND modified:'+modified
             if tags!=None:
                 query += ' AND tags:'+tags
+            item_pages = _search_pages(self._gis, query, page_size)
+
+        #Yield searched pages, one batch at a time
+        for items in item_pages:
+            pagelist = [Page(self._gis, item) for item in items]
+            if prefetch:
+                self.prefetch(pagelist, max_workers=max_workers)
+            for page in pagelist:
+                yield page
+
+    def search(self, title=None, owner=None, created=None, modified=None, tags=None, prefetch=False, max_workers=8):
+        """ 
+        Searches for pages.
         
-            #Search
-            items = self._gis.content.search(query=query, max_items=5000)
+        ===============     ====================================================================
+        **Argument**        **Description**
+        ---------------     --------------------------------------------------------------------
+        title               Optional string. Return pages with provided string in title.
+        ---------------     --------------------------------------------------------------------
+        owner               Optional string. Return pages owned by a username.
+        ---------------     --------------------------------------------------------------------
+        created             Optional string. Date the page was created.
+                            Shown in milliseconds since UNIX epoch.
+        ---------------     --------------------------------------------------------------------
+        modified            Optional string. Date the page was last modified.
+                            Shown in milliseconds since UNIX epoch
+        ---------------     --------------------------------------------------------------------
+        tags                Optional string. User-defined tags that describe the page.
+        ---------------     --------------------------------------------------------------------
+        prefetch            Optional boolean. If True, the definitions of all matching pages
+                            are fetched up front, concurrently. Default is False, the 
+                            definition is fetched on first access.
+                            The error of a definition that could not be fetched is kept in
+                            the `definition_error` of the page, whose definition is None.
+        ---------------     --------------------------------------------------------------------
+        max_workers         Optional integer. The maximum number of concurrent requests used
+                            when resolving the pages of a site and when prefetching.
+                            Default is 8.
+        ===============     ====================================================================
         
-        #Return searched pages
-        for item in items:
-            pagelist.append(Page(self._gis, item))
-        return pagelist
\ No newline at end of file
+        :return:
+           A list of matching pages.
+        """
+
+        return list(self.iter_search(title=title, owner=owner, created=created, modified=modified, tags=tags, prefetch=prefetch, max_workers=max_workers))
\ No newline at end of file
@@ -2,9 +2,12 @@ from arcgis.gis import GIS
 from arcgis._impl.common._mixins import PropertyMap
 from arcgis._impl.common._isd import InsensitiveDict
 from arcgishub.pages import Page, PageManager
+from arcgishub.domains import DomainRegistry, _discard_site_domains, _domain_registry, _record_domain
+from arcgishub._utils import _active_batch, _add_to_content_group, _changed_paths, _changed_properties, _domain_cache, _fingerprint, _forget_site_domains, _merge_search_pages, _run_concurrently, _pending_definition, _prefetch_definitions, _save_definition, _search_pages, _transfer_items, _write_definition
 from datetime import datetime
 from collections import OrderedDict
 from urllib.parse import urlparse
+import copy
 import json
 import os
 
@@ -21,23 +24,29 @@ def _lazy_property(fn):
         return getattr(self, attr_name)
     return _lazy_property
 
+#Number of catalog groups scoped in a single portal search query
+_CATALOG_GROUPS_PER_QUERY = 25
+
 class Site(OrderedDict):
     """
     Represents a site within a Hub. A site is a container for 
     web accessible content.
     """
     
-    def __init__(self, gis, siteItem):
+    def __init__(self, gis, siteItem, prefetch=False):
         """
-        Constructs an empty Site object
+        Constructs an empty Site object. The site definition is fetched
+        on first access unless `prefetch` is True.
         """
         self.item = siteItem
         self._gis = gis
-        try:
-            self._sitedict = self.item.get_data()
-            self.definition = PropertyMap(self._sitedict)
-        except:
-            self.definition = None
+        self._definition = None
+        self._definition_loaded = False
+        self._baseline = None
+        self.updated_paths = []
+        self.definition_error = None
+        if prefetch:
+            self._load_definition()
             
     def __repr__(self):
         return '<%s title:"%s" owner:%s>' % (
@@ -46,6 +55,61 @@ class Site(OrderedDict):
             self.owner
         )
 
+    @property
+    def _hub(self):
+        """
+        Returns the Hub this site belongs to
+        """
+        return self._gis.hub
+
+    def _load_definition(self):
+        """
+        Fetches the site data and builds the definition from it
+        """
+        #share the definition edited in the open batch, if any
+        definition = _pending_definition(self)
+        if definition is not None:
+            self.definition = definition
+            return
+        try:
+            self._set_definition(self.item.get_data())
+            self.definition_error = None
+        except Exception as e:
+            self.definition = None
+            self.definition_error = e
+
+    def _set_definition(self, data):
+        """
+        Builds the site definition from already fetched site data
+        """
+        self._sitedict = data
+        self.definition = PropertyMap(self._sitedict)
+        self._baseline = _fingerprint(self.definition)
+
+    @property
+    def definition(self):
+        """
+        Getter/Setter for the site definition (the data of the site item).
+        The data is fetched on first access.
+        """
+        if not self._definition_loaded:
+            self._load_definition()
+        return self._definition
+
+    @definition.setter
+    def definition(self, value):
+        self._definition = value
+        self._definition_loaded = True
+
+    @property
+    def changed_paths(self):
+        """
+        Returns the paths of the site definition (e.g. `values.layout`) that changed
+        since the definition was fetched or last written. `updated_paths` holds
+        the paths written by the last update.
+        """
+        return _changed_paths(self._baseline, self.definition)
+
     @property
     def itemid(self):
         """
@@ -168,34 +232,35 @@ class Site(OrderedDict):
         """
         return PageManager(self._gis, self)
 
-    def add_content(self, items_list):
+    def add_content(self, items_list, max_workers=8):
         """
-        Adds a batch of items to the site content library.
+        Adds a batch of items to the site content library. The existing sharing of
+        every item is kept. Item ids are resolved in batches and items of the current
+        user with the same access level are shared together. Items owned by other
+        users are shared one by one. None elements are skipped.
 
         =====================     ====================================================================
         **Parameter**              **Description**
         ---------------------     --------------------------------------------------------------------
         items_list                Required list. A list of Item or item ids to add to the site.
+        ---------------------     --------------------------------------------------------------------
+        max_workers               Optional integer. The maximum number of concurrent requests.
+                                  Default is 8.
         =====================     ====================================================================
+
+        :return:
+           A dictionary with a `results` list holding, for every item of items_list in
+           order, its `itemId`, `success` and `notSharedWith`, and an `error` message
+           for the items that could not be added.
+
+        .. code-block:: python
+
+            USAGE EXAMPLE: Add datasets to the content library
+
+            status = mySite.add_content(['itemId1', 'itemId2'])
+            failed = [r['itemId'] for r in status['results'] if not r['success']]
         """
-        # If input list is of item_ids, generate a list of corresponding items
-        if type(items_list[0]) == str:
-            items = [self._gis.content.get(item_id) for item_id in items_list]
-        else:
-            items = items_list
-        # Fetch existing sharing privileges for each item, to retain them after adding to content library
-        for item in items:
-            sharing = item.shared_with
-            everyone = sharing["everyone"]
-            org = sharing["org"]
-            groups = sharing["groups"]
-            # add current site's content group to list of groups to share to
-            groups.append(self.content_group_id)
-            # share item to this group
-            status = item.share(everyone=everyone, org=org, groups=groups)
-            if status["results"][0]["success"] == False:
-                return status
-        return status
+        return _add_to_content_group(self._gis, items_list, self.content_group_id, max_workers=max_workers)
 
     def add_catalog_group(self, group_id):
         """
@@ -208,7 +273,7 @@ class Site(OrderedDict):
         """
         if group_id not in self.catalog_groups:
             self.definition['catalog']['groups'].append(group_id)
-            self.item.update(item_properties={'text': self.definition})
+            _write_definition(self)
             return self.catalog_groups
 
     def delete_catalog_group(self, group_id):
@@ -223,9 +288,17 @@ class Site(OrderedDict):
         if group_id not in self.catalog_groups:
             raise Exception('Group is not a part of site catalog. Please check the group_id')
         self.definition['catalog']['groups'] = [group for group in self.catalog_groups if group!=group_id]
-        self.item.update(item_properties={'text': self.definition})
+        _write_definition(self)
         return self.catalog_groups
 
+    def _forget_pending_edits(self):
+        """
+        Drops pending edits of the site in the open batch, before the site item is deleted
+        """
+        batch = _active_batch(self._gis)
+        if batch is not None:
+            batch._forget(self.itemid)
+
     def delete(self):
         """
         Deletes the site. If unable to delete, raises a RuntimeException.
@@ -242,14 +315,13 @@ class Site(OrderedDict):
             
             >> True
         """
-        #Unlink site from pages. Delete page if not linked to other sites
+        _forget_site_domains(self._gis, self.itemid)
+        #Unlink site from pages in one batch. Delete page if not linked to other sites
         try:
             site_pages = self.pages.search()
             #If pages exist
             if len(site_pages) > 0:
-                for page in site_pages:
-                    #Unlink page (deletes if)
-                    self.pages.unlink(page)
+                self.pages.unlink_many(site_pages)
         #In case site definition is empty
         except:
             pass
@@ -275,6 +347,7 @@ class Site(OrderedDict):
             pass
         #Delete enterprise site
         if not self._gis._portal.is_arcgisonline:
+            self._forget_pending_edits()
             return self.item.delete()
         else:
             #Deleting hub sites
@@ -295,12 +368,14 @@ class Site(OrderedDict):
                 path = f"https://{self._hub._hub_environment}/api/v3/domains/" + _siteId
                 _delete_domain = session.delete(url=path, headers=headers)
                 if _delete_domain.status_code == 200:
+                    _discard_site_domains(self._gis, self.itemid)
+                    self._forget_pending_edits()
                     # Delete site item
                     return self.item.delete()
                 else:
                     return _delete_domain.content
 
-    def reassign_to(self, target_owner):
+    def reassign_to(self, target_owner, max_workers=8, progress=None):
         """
         Allows the administrator to reassign the site object from one 
         user to another. 
@@ -312,40 +387,42 @@ class Site(OrderedDict):
         **Argument**              **Description**
         ---------------------     --------------------------------------------------------------------
         target_owner              Required string. The new desired owner of the site.
+        ---------------------     --------------------------------------------------------------------
+        max_workers               Optional integer. The maximum number of items reassigned
+                                  concurrently. Default is 8.
+        ---------------------     --------------------------------------------------------------------
+        progress                  Optional callable. Called with the number of items reassigned so
+                                  far and the total number of items, as each item is reassigned.
         =====================     ====================================================================
+
+        :return:
+           The site item. Raises an exception listing the items that could not be
+           transferred, once all the other items and groups have been transferred.
         """
         #check if admin user is performing this action
         if 'admin' not in self._gis.users.me.role:
             return Exception("You do not have the administrator privileges to perform this action.")
+        errors = {}
         #check if core team is needed by checking the role of the target_owner
         if self._gis.users.get(target_owner).role=='org_admin':
             #check if the initiative comes with core team by checking owner's role
             if self._gis.users.get(self.owner).role=='org_admin':
                 #fetch the core team for the initative 
                 core_team = self._gis.groups.get(self.collab_group_id)
-                #fetch the contents shared with this team
-                core_team_content = core_team.content()
+                #fetch the contents shared with this team, up to the portal search limit
+                core_team_content = core_team.content(max_items=10000)
                 #check if target_owner is part of core team, else add them to core team
                 members = core_team.get_members()
-                if target_owner not in members['admins'] or target_owner not in members['users']:
+                if target_owner not in members['admins'] and target_owner not in members['users']:
                     core_team.add_users(target_owner)
-                #remove items from core team 
-                self._gis.content.unshare_items(core_team_content, groups=[core_team])
-                #reassign to target_owner
-                for item in core_team_content:
-                    item.reassign_to(target_owner)
-                #fetch the items again since they have been reassigned
-                new_content_list = []
-                for item in core_team_content:
-                    item_temp = self._gis.content.get(item.id)
-                    new_content_list.append(item_temp)
-                #share item back to the content group
-                self._gis.content.share_items(new_content_list, groups=[core_team], allow_members_to_edit=True)
+                #unshare, reassign to target_owner and share back the content of the core team
+                errors = _transfer_items(self._gis, core_team_content, target_owner, group=core_team,
+                                         max_workers=max_workers, progress=progress)
                 #reassign core team to target owner
                 core_team.reassign_to(target_owner)
             else:
                 #create core team necessary for the initiative
-                _collab_group_title = title + ' Core Team'
+                _collab_group_title = self.title + ' Core Team'
                 _collab_group_dict = {
                     "title": _collab_group_title, 
                     "tags": ["Hub Group", "Hub Site Group", "Hub Core Team Group", "Hub Team Group"], 
@@ -358,31 +435,121 @@ class Site(OrderedDict):
                 collab_group.protected = True
                 self.collab_group_id = collab_group.id
         else:
-            #just reassign the initiative and site items
-            self.item.reassign_to(target_owner)
-            site_pages = self.pages.search()
-            #If pages exist
-            if len(site_pages) > 0:
-                for page in site_pages:
-                    #Unlink page (deletes if)
-                    page.item.reassign_to(target_owner) 
+            #just reassign the site and page items
+            site_items = [self.item] + [page.item for page in self.pages.search()]
+            errors = _transfer_items(self._gis, site_items, target_owner, max_workers=max_workers, progress=progress)
         #fetch content group
         content_team = self._gis.groups.get(self.content_group_id)
         #reassign to target_owner
         content_team.reassign_to(target_owner)
+        if errors:
+            raise Exception('Unable to transfer %d of the items to %s: %s' % (
+                len(errors), target_owner, ', '.join('%s (%s)' % (itemid, error) for itemid, error in errors.items())))
         return self._gis.content.get(self.itemid)
 
+    def _catalog_queries(self, query=None, item_type=None):
+        """
+        Builds the portal search queries for the site catalog. Each query is scoped
+        to a chunk of the catalog groups and carries the title and type filters.
+        """
+        clauses = []
+        if query!=None:
+            clauses.append('title:"%s"' % query.replace('"', ''))
+        if item_type!=None:
+            types = [item_type] if isinstance(item_type, str) else item_type
+            clauses.append('(' + ' OR '.join('type:"%s"' % t for t in types) + ')')
+        groups = self.catalog_groups
+        queries = []
+        for start in range(0, len(groups), _CATALOG_GROUPS_PER_QUERY):
+            scope = ' OR '.join('group:%s' % group_id for group_id in groups[start:start+_CATALOG_GROUPS_PER_QUERY])
+            queries.append(' AND '.join(['(' + scope + ')'] + clauses))
+        return queries
 
-    def search(self, query=None, item_type=None):
+    def iter_search(self, query=None, item_type=None, sort_field=None, sort_order=None, max_items=None, page_size=100, max_workers=8):
+        """ 
+        Search and filter content for a site, yielding items as the search results arrive.
+        The filters are applied by the portal search, so only matching items are 
+        transferred. Items shared with several catalog groups are only yielded once.
+        The portal search returns at most the first 10,000 results of each search.
+        
+        =====================     ====================================================================
+        **Argument**              **Description**
+        ---------------------     --------------------------------------------------------------------
+        query                     Optional string. Returns items with the search query in their title.
+        ---------------------     --------------------------------------------------------------------
+        item_type                 Optional string or list. Returns items of particular type(s).
+        ---------------------     --------------------------------------------------------------------
+        sort_field                Optional string. The item field to sort the results by, 
+                                  e.g. 'title', 'modified', 'numViews'.
+        ---------------------     --------------------------------------------------------------------
+        sort_order                Optional string. 'asc' or 'desc'. Default is 'asc'.
+        ---------------------     --------------------------------------------------------------------
+        max_items                 Optional integer. The maximum number of items to return.
+                                  Default is None, all matching items are returned.
+        ---------------------     --------------------------------------------------------------------
+        page_size                 Optional integer. The number of items fetched per search request.
+                                  Default and maximum is 100.
+        ---------------------     --------------------------------------------------------------------
+        max_workers               Optional integer. Sites with more than 25 catalog groups are searched
+                                  with one search per 25 groups. This is the maximum number of these
+                                  searches whose first page is fetched concurrently. Default is 8.
+        =====================     ====================================================================
+        
+        :return:
+           A generator of items shared with this site. Further pages are only fetched as items are
+           consumed, and the sort order holds across all the catalog groups.
+        
+        .. code-block:: python
+            
+            USAGE EXAMPLE: Print the titles of the most viewed web maps in a site catalog
+            
+            site1 = myHub.sites.get('itemId12345')
+            for item in site1.iter_search(item_type='Web Map', sort_field='numViews', sort_order='desc'):
+                print(item.title)
+        """
+        #Sites with many catalog groups need one search per chunk of groups, merged
+        #lazily in sort order
+        queries = self._catalog_queries(query, item_type)
+        items = _merge_search_pages(self._gis, queries, page_size, sort_field, sort_order, max_workers)
+        #the portal tokenizes types, e.g. 'Web Map' also matches 'Web Mapping Application'
+        types = None if item_type is None else set([item_type] if isinstance(item_type, str) else item_type)
+
+        seen = set()
+        for item in items:
+            if types is not None and item.type not in types:
+                continue
+            #eliminate duplicate items
+            if item.id in seen:
+                continue
+            seen.add(item.id)
+            yield item
+            if max_items is not None and len(seen) >= max_items:
+                return
+
+    def search(self, query=None, item_type=None, sort_field=None, sort_order=None, max_items=None, page_size=100, max_workers=8):
         """ 
         Search and filter content for a site. 
         
         =====================     ====================================================================
         **Argument**              **Description**
         ---------------------     --------------------------------------------------------------------
-        query                     Optional string. Filters items by presence of search query in title.
+        query                     Optional string. Returns items with the search query in their title.
+        ---------------------     --------------------------------------------------------------------
+        item_type                 Optional string or list. Returns items of particular type(s).
+        ---------------------     --------------------------------------------------------------------
+        sort_field                Optional string. The item field to sort the results by, 
+                                  e.g. 'title', 'modified', 'numViews'.
         ---------------------     --------------------------------------------------------------------
-        item_type                 Optional list. Returns items of particular type.
+        sort_order                Optional string. 'asc' or 'desc'. Default is 'asc'.
+        ---------------------     --------------------------------------------------------------------
+        max_items                 Optional integer. The maximum number of items to return.
+                                  Default is None, all matching items are returned.
+        ---------------------     --------------------------------------------------------------------
+        page_size                 Optional integer. The number of items fetched per search request.
+                                  Default and maximum is 100.
+        ---------------------     --------------------------------------------------------------------
+        max_workers               Optional integer. The maximum number of concurrent search requests
+                                  for sites with many catalog groups. Default is 8.
         =====================     ====================================================================
         
         :return:
@@ -399,22 +566,8 @@ class Site(OrderedDict):
             
             >> List of relevant items
         """
-        groups = self.catalog_groups
-        all_content = []
-        for group_id in groups:
-            try:  # user may not have access to this group
-                group = self._gis.groups.get(group_id)
-                all_content = all_content + group.content()
-            except: # AttributeError:
-                pass
-
-        #eliminate duplicate items
-        result = [i for n, i in enumerate(all_content) if i not in all_content[:n]]
-        if query!=None:
-            result = [item for item in result if query.lower() in item.title.lower()]
-        if item_type!=None:
-            result = [item for item in result if item.type==item_type]
-        return result
+        return list(self.iter_search(query=query, item_type=item_type, sort_field=sort_field, sort_order=sort_order, 
+                                     max_items=max_items, page_size=page_size, max_workers=max_workers))
 
     def update(self, site_properties=None, subdomain=None):
         """ Updates the site.
@@ -423,6 +576,7 @@ class Site(OrderedDict):
             For site_properties, pass in arguments for only the properties you want to be updated.
             All other properties will be untouched.  For example, if you want to update only the
             site's description, then only provide the description argument in site_properties.
+            site_properties only updates the site item; it is no longer merged into the site definition.
         
         =====================     ====================================================================
         **Argument**              **Description**
@@ -436,7 +590,9 @@ class Site(OrderedDict):
         https://esri.github.io/arcgis-python-api/apidoc/html/arcgis.gis.toc.html#arcgis.gis.Item.update
         
         :return:
-           A boolean indicating success (True) or failure (False).
+           A boolean indicating success (True) or failure (False). Nothing is sent,
+           and True returned, if the update changes nothing. The changed paths
+           are recorded in `updated_paths`.
         
         .. code-block:: python
             USAGE EXAMPLE: Update a site successfully
@@ -446,13 +602,21 @@ class Site(OrderedDict):
         
             >> True
         """
-        _site_data = self.definition
-        if site_properties:
-            for key, value in site_properties.items():
-                _site_data[key] = value
+        #Only the item properties that differ from the site item are sent
+        _changed = _changed_properties(self.item, site_properties)
+        # format subdomain if needed
         if subdomain:
-            # format subdomain if needed
             subdomain = subdomain.replace(" ", "-").lower()
+            # keeping the current subdomain needs no domain changes
+            try:
+                if self.definition['values']['subdomain'] == subdomain:
+                    subdomain = None
+            except (KeyError, TypeError):
+                pass
+        if subdomain or _changed:
+            #the cached hostnames of the site are about to be stale
+            _forget_site_domains(self._gis, self.itemid)
+        if subdomain:
             #Domain manipulation for new subdomain
             if self._gis._portal.is_arcgisonline:
                 #Check for length of domain
@@ -473,6 +637,7 @@ class Site(OrderedDict):
                 _delete_domain = session.delete(url=path, headers=headers)
                 # if deletion is successful
                 if _delete_domain.status_code == 200:
+                    _discard_site_domains(self._gis, self.itemid)
                     # Create new domain entry
 
                     # Create domain entry for new site
@@ -502,6 +667,7 @@ class Site(OrderedDict):
                         headers=headers,
                     )
                     if _new_domain.status_code == 200:
+                        _record_domain(self._gis, _new_domain.json())
                         # define new domain and hostname
                         hostname = (
                             subdomain
@@ -519,9 +685,11 @@ class Site(OrderedDict):
                         data["values"]["defaultHostname"] = hostname
                         data["values"]["subdomain"] = subdomain
                         data["values"]["internalUrl"] = hostname
-                        if self.item.update(
-                            item_properties={"url": domain, "text": data}
-                        ):
+                        _changed.update({"url": domain, "text": data})
+                        _paths = sorted(set(self.changed_paths) | set(_changed) - {"text"})
+                        if self.item.update(item_properties=_changed):
+                            self._baseline = _fingerprint(data)
+                            self.updated_paths = _paths
                             return domain
                     # if creating new domain entry fails
                     else:
@@ -545,9 +713,17 @@ class Site(OrderedDict):
                 data['values']['subdomain'] = subdomain
                 data['values']['internalUrl'] = hostname
                 data["values"]["clientId"] = _client_key
-                if self.item.update(item_properties={'typeKeywords':typeKeywords, 'url':domain, 'text':data}):
+                _changed.update({'typeKeywords':typeKeywords, 'url':domain, 'text':data})
+                _paths = sorted(set(self.changed_paths) | set(_changed) - {'text'})
+                if self.item.update(item_properties=_changed):
+                    self._baseline = _fingerprint(data)
+                    self.updated_paths = _paths
                     return domain
-        return self.item.update(_site_data)
+        #Skip the request if no property changed
+        self.updated_paths = sorted(_changed)
+        if not _changed:
+            return True
+        return self.item.update(item_properties=_changed)
 
     
     def update_layout(self, layout):
@@ -563,7 +739,9 @@ class Site(OrderedDict):
         =====================     ====================================================================
         
         :return:
-           A boolean indicating success (True) or failure (False).
+           A boolean indicating success (True) or failure (False). Nothing is sent,
+           and True returned, if the update changes nothing. The changed paths
+           are recorded in `updated_paths`.
         
         .. code-block:: python
             
@@ -576,14 +754,18 @@ class Site(OrderedDict):
             
             >> True
         """
+        self.definition["values"]["layout"] = layout._json()
+        # Nothing to publish if the layout did not change
+        if not self.changed_paths:
+            self.updated_paths = []
+            return True
         # Deleting the draft file for this site, if exists
         resources = self.item.resources.list()
         for resource in resources:
             if "draft-" in resource["resource"]:
                 self.item.resources.remove(file=resource["resource"])
         # Update the data of the site
-        self.definition["values"]["layout"] = layout._json()
-        return self.item.update(item_properties={"text": self.definition})
+        return _save_definition(self)
 
     def update_theme(self, theme):
         """ Updates the theme of the site. 
@@ -598,7 +780,9 @@ class Site(OrderedDict):
         =====================     ====================================================================
         
         :return:
-           A boolean indicating success (True) or failure (False).
+           A boolean indicating success (True) or failure (False). Nothing is sent,
+           and True returned, if the update changes nothing. The changed paths
+           are recorded in `updated_paths`.
         
         .. code-block:: python
             
@@ -611,14 +795,18 @@ class Site(OrderedDict):
             
             >> True
         """
+        self.definition['values']['theme'] = theme._json()
+        #Nothing to publish if the theme did not change
+        if not self.changed_paths:
+            self.updated_paths = []
+            return True
         #Deleting the draft file for this site, if exists
         resources = self.item.resources.list()
         for resource in resources:
             if "draft-" in resource["resource"]:
                 self.item.resources.remove(file=resource["resource"])
         #Update the data of the site
-        self.definition['values']['theme'] = theme._json()
-        return self.item.update(item_properties={'text': self.definition})
+        return _save_definition(self)
 
 
 class SiteManager(object):
@@ -633,6 +821,32 @@ class SiteManager(object):
         self._gis = self._hub.gis
         self.initiative = initiative
 
+    @property
+    def domains(self):
+        """
+        The registry of the Hub domain records of the organization, loaded with a single
+        request on first use and shared by all the site managers of the GIS. Lookups and
+        subdomain availability checks on the registry make no requests, and `get_by_domain`
+        and `add` use it once loaded. See :class:`~hub.domains.DomainRegistry`.
+
+        .. note::
+            Domain records only exist for sites in ArcGIS Online.
+
+        .. code-block:: python
+
+            USAGE EXAMPLE: Find the site of a hostname and check a subdomain
+
+            record = myHub.sites.domains.get('opendata-myorg.hub.arcgis.com')
+            record['siteId']
+            myHub.sites.domains.is_available('new-site')
+        """
+        if not self._gis._portal.is_arcgisonline:
+            raise Exception("Domain records are only available for sites in ArcGIS Online.")
+        registry = _domain_registry(self._gis)
+        if registry is None:
+            registry = self._gis._hub_domain_registry = DomainRegistry(self._hub)
+        return registry
+
     def _create_and_register_site(self, site, subdomain, site_data, content_group_id, collab_group_id):
         """
         Registers site as an app and Creates a domain entry for new site. 
@@ -677,6 +891,7 @@ class SiteManager(object):
                 headers=headers,
             )
             if _new_domain.status_code == 200:
+                _record_domain(self._gis, _new_domain.json())
                 _siteId = _new_domain.json()["id"]
                 _client_key = _new_domain.json()["clientKey"]
             else:
@@ -802,17 +1017,23 @@ class SiteManager(object):
             #Domain manipulation
             domain = self._gis.url[:8] + subdomain + '-' + self._gis.properties['urlKey'] + '.hub.arcgis.com'
             _request_url = f"https://{self._hub._hub_environment}/utilities/domains/"+domain[8:]
-            session = self._gis._con._session
-            headers = {k: v for k, v in session.headers.items()}
-            headers["Content-Type"] = "application/json"
-            headers["Authorization"] = "X-Esri-Authorization"
-            response = session.get(
-                url=f"https://{self._hub._hub_environment}/api/v3/domains/" + domain[8:],
-                headers=headers,
-            )
+            registry = _domain_registry(self._gis)
+            if registry is not None and registry.loaded:
+                #check against the loaded domain records
+                exists = domain[8:] in registry
+            else:
+                session = self._gis._con._session
+                headers = {k: v for k, v in session.headers.items()}
+                headers["Content-Type"] = "application/json"
+                headers["Authorization"] = "X-Esri-Authorization"
+                response = session.get(
+                    url=f"https://{self._hub._hub_environment}/api/v3/domains/" + domain[8:],
+                    headers=headers,
+                )
+                exists = response.status_code != 404
         
             #Check if domain doesn't exist
-            if response.status_code==404:
+            if not exists:
                 pass
             else:
             #If exists check if counter needs updating and update it
@@ -962,7 +1183,7 @@ class SiteManager(object):
         site.update(item_properties={'text': _data, 'url': domain})
         return Site(self._gis, site)
 
-    def clone(self, site, pages=True, title=None):
+    def clone(self, site, pages=True, title=None, max_workers=8):
         """
         Clone allows for the creation of a site that is derived from the current site.
 
@@ -978,12 +1199,16 @@ class SiteManager(object):
         pages               Optional Boolean. Decides if pages will be copied. Default is True.
         ---------------     --------------------------------------------------------------------
         title               Optional String.
+        ---------------     --------------------------------------------------------------------
+        max_workers         Optional integer. The maximum number of pages cloned concurrently.
+                            Default is 8.
         ===============     ====================================================================
         
         :return:
            Site.
         """
         collab_group_id = None
+        collab_group = None
         from datetime import timezone
         now = datetime.now(timezone.utc)
         #Checking if item of correct type has been passed 
@@ -1093,25 +1318,30 @@ class SiteManager(object):
         except:
             pass
 
-        #Register new site and update its data
-        _data = self._create_and_register_site(new_item, subdomain, site.definition, content_group_id, collab_group_id)
-
-        new_item.update(item_properties={'text': _data, 'url': domain})
+        #Register new site, from a copy of the data of the site being cloned
+        _data = self._create_and_register_site(new_item, subdomain, copy.deepcopy(dict(site.definition)), content_group_id, collab_group_id)
         new_site = Site(self._gis, new_item)
 
-        #Pages of the site
-        site_pages = site.pages.search()
-        #If pages exist
-        if len(site_pages) > 0:
-            #Check the value of param
-            if pages:
-                for page in site_pages:
-                    try:
-                        new_site.pages.unlink(page)
-                    except:
-                        pass
-                    new_site.pages.clone(page)
+        #Clone the pages concurrently, each created with its final definition
+        errors = {}
+        if pages:
+            site_pages = site.pages.search(prefetch=True, max_workers=max_workers)
+            _clone = lambda page: new_site.pages._create_clone(page, new_site, collab_group)
+            _new_pages = []
+            for page, new_page, error in _run_concurrently(_clone, site_pages, max_workers):
+                if error is not None:
+                    errors[page.itemid] = error
+                else:
+                    _new_pages.append({'id': new_page.itemid, 'title': new_page.title, 'slug': new_page.slug})
+            #Link the cloned pages instead of the pages of the site being cloned
+            _data['values']['pages'] = _new_pages
 
+        #Write the site data and all page links at once
+        new_item.update(item_properties={'text': json.dumps(_data), 'url': domain})
+        new_site._set_definition(_data)
+        if errors:
+            raise Exception('Site cloned, but unable to clone %d of its pages: %s' % (
+                len(errors), ', '.join('%s (%s)' % (itemid, error) for itemid, error in errors.items())))
         return new_site
 
     def get(self, site_id):
@@ -1139,13 +1369,18 @@ class SiteManager(object):
         else:
             raise TypeError("Item is not a valid site or is inaccessible.")
 
-    def get_by_domain(self, domain_url):
+    def get_by_domain(self, domain_url, use_cache=True):
         """ Returns the site object for the specified domain url.
         
         =======================    =============================================================
         **Argument**               **Description**
         -----------------------    -------------------------------------------------------------
         domain_url                 Required string. The site url.
+        -----------------------    -------------------------------------------------------------
+        use_cache                  Optional boolean. If True, a hostname resolved in the last 5
+                                   minutes is returned from the cache, without any request.
+                                   If False, the domain record and site item are fetched again
+                                   and the cache is refreshed. Default is True.
         =======================    =============================================================
         
         :return:
@@ -1156,6 +1391,11 @@ class SiteManager(object):
             E.g. If your Hub instance is an ArcGIS Online instance, then you can 
             fetch ArcGIS Online sites by url, and if you have signed into an ArcGIS
             Enterprise Instance, only sites on premise will be available.
+
+        .. note::
+            The cache holds up to 1024 hostnames and is shared by all the site managers
+            of the GIS. Updating the subdomain or properties of a site, or deleting it,
+            through its Site object drops its cached hostnames.
         
         .. code-block:: python
             
@@ -1166,33 +1406,70 @@ class SiteManager(object):
         """
         #Check if Hub(GIS) is an ArcGIS Online instance
         if self._gis._portal.is_arcgisonline:
+            domain_url = domain_url.lower()
             if "http" in domain_url:
                 domain_url = urlparse(domain_url).netloc
-            path = f"https://{self._hub._hub_environment}/api/v3/domains/" + domain_url
-            # fetch site itemid from domain service
-            session = self._gis._con._session
-            headers = {k: v for k, v in session.headers.items()}
-            headers["Content-Type"] = "application/json"
-            headers["Authorization"] = "X-Esri-Authorization"
-            _site_domain = self._gis._con.get(path, headers=headers)
+            #return the site of a recently resolved hostname
+            cache = _domain_cache(self._gis)
+            cached = cache.get(domain_url) if use_cache else None
+            if cached is not None:
+                return Site(self._gis, cached[1])
+            #resolve the hostname from the loaded domain records, if any
+            registry = _domain_registry(self._gis)
+            _site_domain = registry.get(domain_url) if registry is not None and registry.loaded else None
+            if _site_domain is None:
+                path = f"https://{self._hub._hub_environment}/api/v3/domains/" + domain_url
+                # fetch site itemid from domain service
+                session = self._gis._con._session
+                headers = {k: v for k, v in session.headers.items()}
+                headers["Content-Type"] = "application/json"
+                headers["Authorization"] = "X-Esri-Authorization"
+                _site_domain = self._gis._con.get(path, headers=headers)
             try:
                 siteId = _site_domain["siteId"]
             except KeyError:
                 raise Exception("Domain record not found. Please check your domain_url.")
-            return self.get(siteId)
+            site = self.get(siteId)
+            cache.set(domain_url, (siteId, site.item))
+            return site
         #For ArcGIS Enterprise
         else:
             subdomain = domain_url.split("#/",1)[1]
             _query = 'hubsubdomain|'+subdomain
             items = self._gis.content.search(query='typekeywords:hubSite,'+_query, max_items=5000)
             #Return searched sites
+            sitelist = []
             for item in items:
                 sitelist.append(Site(self._gis, item))
             return sitelist
             
-    def search(self, title=None, owner=None, created=None, modified=None, tags=None):
+    def prefetch(self, sites, max_workers=8):
+        """
+        Fetches the definitions of a list of sites concurrently, so that later access
+        to their `definition` does not issue a request per site.
+
+        ===============     ====================================================================
+        **Argument**        **Description**
+        ---------------     --------------------------------------------------------------------
+        sites               Required list of Site objects.
+        ---------------     --------------------------------------------------------------------
+        max_workers         Optional integer. The maximum number of concurrent requests.
+                            Default is 8.
+        ===============     ====================================================================
+
+        :return:
+           A dictionary of itemid to the error raised for every site whose definition
+           could not be fetched. Empty if all definitions were fetched.
+           The error is also kept in the `definition_error` of the site.
+        """
+        return _prefetch_definitions(sites, max_workers=max_workers)
+
+    def iter_search(self, title=None, owner=None, created=None, modified=None, tags=None, page_size=100, prefetch=False, max_workers=8):
         """ 
-        Searches for sites.
+        Searches for sites, yielding them page by page as the search results arrive.
+        Unlike `search`, the results are not held in memory. The portal search returns
+        at most the first 10,000 results of a query, as it rejects a start beyond 10,000;
+        narrow the query (e.g. by `created` or `modified`) to go through more.
         
         ===============     ====================================================================
         **Argument**        **Description**
@@ -1208,17 +1485,33 @@ class SiteManager(object):
                             Shown in milliseconds since UNIX epoch
         ---------------     --------------------------------------------------------------------
         tags                Optional string. User-defined tags that describe the site.
+        ---------------     --------------------------------------------------------------------
+        page_size           Optional integer. The number of sites fetched per search request.
+                            Default and maximum is 100.
+        ---------------     --------------------------------------------------------------------
+        prefetch            Optional boolean. If True, the definitions of the sites in each 
+                            page are fetched concurrently before the page is yielded. 
+                            Default is False, the definition is fetched on first access.
+                            The error of a definition that could not be fetched is kept in
+                            the `definition_error` of the site, whose definition is None.
+        ---------------     --------------------------------------------------------------------
+        max_workers         Optional integer. The maximum number of concurrent requests used
+                            when prefetching. Default is 8.
         ===============     ====================================================================
         
         :return:
-           A list of matching sites.
-        """
+           A generator of matching sites.
 
-        sitelist = []
-        
+        .. code-block:: python
+            
+            USAGE EXAMPLE: List the titles of all sites in the org
+            
+            for site in myHub.sites.iter_search():
+                print(site.title)
+        """
         if self.initiative is not None:
-            _site_id = self.initiative.site_id
-            return self.get(_site_id)
+            yield self.get(self.initiative.site_id)
+            return
 
         #Build search query
         query = 'typekeywords:hubSite'
@@ -1232,11 +1525,50 @@ class SiteManager(object):
             query += ' AND modified:'+modified
         if tags!=None:
             query += ' AND tags:'+tags
+
+        #Search, one page at a time
+        for items in _search_pages(self._gis, query, page_size):
+            sitelist = [Site(self._gis, item) for item in items]
+            if prefetch:
+                self.prefetch(sitelist, max_workers=max_workers)
+            for site in sitelist:
+                yield site
+
+    def search(self, title=None, owner=None, created=None, modified=None, tags=None, prefetch=False, max_workers=8):
+        """ 
+        Searches for sites.
         
-        #Search
-        items = self._gis.content.search(query=query, max_items=5000)
+        ===============     ====================================================================
+        **Argument**        **Description**
+        ---------------     --------------------------------------------------------------------
+        title               Optional string. Return sites with provided string in title.
+        ---------------     --------------------------------------------------------------------
+        owner               Optional string. Return sites owned by a username.
+        ---------------     --------------------------------------------------------------------
+        created             Optional string. Date the site was created.
+                            Shown in milliseconds since UNIX epoch.
+        ---------------     --------------------------------------------------------------------
+        modified            Optional string. Date the site was last modified.
+                            Shown in milliseconds since UNIX epoch
+        ---------------     --------------------------------------------------------------------
+        tags                Optional string. User-defined tags that describe the site.
+        ---------------     --------------------------------------------------------------------
+        prefetch            Optional boolean. If True, the definitions of all matching sites
+                            are fetched up front, concurrently. Default is False, the 
+                            definition is fetched on first access.
+                            The error of a definition that could not be fetched is kept in
+                            the `definition_error` of the site, whose definition is None.
+        ---------------     --------------------------------------------------------------------
+        max_workers         Optional integer. The maximum number of concurrent requests used
+                            when prefetching. Default is 8.
+        ===============     ====================================================================
         
-        #Return searched sites
-        for item in items:
-            sitelist.append(Site(self._gis, item))
-        return sitelist
+        :return:
+           A list of matching sites.
+        """
+
+        if self.initiative is not None:
+            _site_id = self.initiative.site_id
+            return self.get(_site_id)
+
+        return list(self.iter_search(title=title, owner=owner, created=created, modified=modified, tags=tags, prefetch=prefetch, max_workers=max_workers))
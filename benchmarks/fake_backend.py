@@ -0,0 +1,986 @@
+'''
+In-process stand-in for the ArcGIS Online / Hub REST surface used by arcgishub.
+
+`FakeBackend` keeps items, groups, domain records, events and discussions in
+memory and exposes them through the objects arcgishub talks to:
+
+* `backend.gis` duck-types the `arcgis.gis.GIS` members the package uses
+  (content, groups, users, properties, _portal, _con).
+* An HTTP transport adapter answers the Hub APIs (`/api/v3/domains`, the Hub
+  Events FeatureServer and `/api/discussions/v1/*`) for any requests session
+  it is mounted on, including `gis._con._session` and the Hub's pooled
+  discussions session.
+
+Every call that would be a round trip to the server is recorded under an
+operation name (e.g. `item.get_data`, `domains.get`). Each call can be slowed
+down with a latency and can fail through failure injection, so that
+performance work can be measured offline and reproducibly.
+
+Usage:
+
+    backend = FakeBackend(latency=0.02)
+    site_item = backend.add_site('Open Data', pages=5, catalog_items=200)
+    hub = backend.hub()
+    site = hub.sites.get(site_item.id)
+    backend.reset()
+    site.search()
+    print(backend.request_count, backend.counts())
+'''
+import os
+import sys
+#run from a checkout without installing the package
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from arcgis._impl.common._mixins import PropertyMap
+from arcgishub.hub import Hub
+from collections import Counter
+from requests.adapters import BaseAdapter
+from urllib.parse import urlparse, parse_qsl, unquote
+import copy
+import itertools
+import json
+import math
+import random
+import re
+import requests
+import threading
+import time
+import uuid
+
+_STORE = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'arcgishub', '_store'))
+
+class FakeBackendError(Exception):
+    '''
+    Raised by the fake GIS objects for injected failures and missing resources,
+    the way the arcgis connection raises for error responses.
+    '''
+
+def _new_id():
+    return uuid.uuid4().hex
+
+def _load_store(name):
+    with open(os.path.join(_STORE, name)) as f:
+        return json.load(f)
+
+def _group_id(group):
+    return group if isinstance(group, str) else group.id
+
+def _as_list(value):
+    if value is None:
+        return []
+    if isinstance(value, str):
+        return [v.strip() for v in value.split(',') if v.strip()]
+    return list(value)
+
+
+#Search query matching
+
+_TOKEN = re.compile(r'\(|\)|[A-Za-z_]+:"[^"]*"|[A-Za-z_]+:[^\s()]+|"[^"]*"|[^\s()]+')
+
+def _tokenize(query):
+    return _TOKEN.findall(query or '')
+
+def _parse(tokens):
+    '''
+    Parses portal search tokens into a predicate on FakeItem.
+    AND binds tighter than OR, adjacent terms are ANDed.
+    '''
+    position = [0]
+
+    def peek():
+        return tokens[position[0]] if position[0] < len(tokens) else None
+
+    def take():
+        token = peek()
+        position[0] += 1
+        return token
+
+    def parse_or():
+        terms = [parse_and()]
+        while peek() == 'OR':
+            take()
+            terms.append(parse_and())
+        return lambda item: any(term(item) for term in terms)
+
+    def parse_and():
+        terms = [parse_term()]
+        while peek() not in (None, 'OR', ')'):
+            if peek() == 'AND':
+                take()
+            terms.append(parse_term())
+        return lambda item: all(term(item) for term in terms)
+
+    def parse_term():
+        token = take()
+        if token == '(':
+            predicate = parse_or()
+            take()
+            return predicate
+        if token == 'NOT':
+            predicate = parse_term()
+            return lambda item: not predicate(item)
+        return _term(token)
+
+    if not tokens:
+        return lambda item: True
+    return parse_or()
+
+def _term(token):
+    if ':' not in token or token.startswith('"'):
+        word = token.strip('"').lower()
+        return lambda item: word in item.title.lower() or word in (item.description or '').lower()
+    field, value = token.split(':', 1)
+    field = field.lower()
+    value = value.strip('"')
+    if field == 'typekeywords':
+        keywords = [k.lower() for k in value.split(',')]
+        return lambda item: all(k in [t.lower() for t in item.typeKeywords] for k in keywords)
+    if field == 'title':
+        return lambda item: value.lower() in item.title.lower()
+    if field == 'type':
+        #the portal tokenizes types, 'Web Map' also matches 'Web Mapping Application'
+        return lambda item: item.type.lower().startswith(value.lower())
+    if field == 'owner':
+        return lambda item: item.owner == value
+    if field == 'id':
+        return lambda item: item.id == value
+    if field == 'tags':
+        return lambda item: value.lower() in [t.lower() for t in item.tags]
+    if field == 'group':
+        return lambda item: value in item._groups
+    #created, modified and other fields are not filtered by the stand-in
+    return lambda item: True
+
+
+#GIS stand-ins
+
+class FakeResources(object):
+    '''
+    Stand-in for `Item.resources`.
+    '''
+    def __init__(self, item):
+        self._item = item
+        self._files = []
+
+    def list(self):
+        self._item._backend._request('item.resources')
+        return [{'resource': name} for name in self._files]
+
+    def remove(self, file=None):
+        self._item._backend._request('item.resources')
+        self._files = [name for name in self._files if name != file]
+        return True
+
+    def add(self, file_name):
+        self._files.append(file_name)
+
+
+class FakeItem(object):
+    '''
+    Stand-in for `arcgis.gis.Item`.
+    '''
+    def __init__(self, backend, item_properties, data=None, owner=None):
+        self._backend = backend
+        self.id = item_properties.get('id') or _new_id()
+        self.title = item_properties.get('title', '')
+        self.type = item_properties.get('type', '')
+        self.typeKeywords = _as_list(item_properties.get('typeKeywords', item_properties.get('typekeywords')))
+        self.tags = _as_list(item_properties.get('tags'))
+        self.description = item_properties.get('description')
+        self.snippet = item_properties.get('snippet')
+        self.url = item_properties.get('url')
+        self.culture = item_properties.get('culture')
+        self.properties = PropertyMap(item_properties.get('properties') or {})
+        self.owner = owner or backend.username
+        self.created = self.modified = int(time.time() * 1000)
+        self.numViews = 0
+        self.layers = []
+        self.resources = FakeResources(self)
+        self.protected = False
+        self._data = None
+        self._set_data(data if data is not None else item_properties.get('text'))
+        self._groups = set()
+        self._everyone = False
+        self._org = False
+        self.access = 'private'
+
+    def __repr__(self):
+        return '<FakeItem title:"%s" type:%s>' % (self.title, self.type)
+
+    def _set_data(self, data):
+        if data is None:
+            return
+        if isinstance(data, (dict, list)):
+            data = json.dumps(data)
+        elif not isinstance(data, str):
+            #PropertyMap and the like are sent as their JSON representation
+            data = str(data)
+        self._data = data
+
+    def _share_state(self, everyone=None, org=None, groups=None):
+        if everyone is not None:
+            self._everyone = bool(everyone)
+        if org is not None:
+            self._org = bool(org)
+        for group in _as_list(groups):
+            self._groups.add(_group_id(group))
+        self._set_access()
+
+    def _set_access(self):
+        #the access level search results report for the sharing state
+        self.access = 'public' if self._everyone else 'org' if self._org else 'shared' if self._groups else 'private'
+
+    def get_data(self, try_json=True):
+        self._backend._request('item.get_data', self.id)
+        if self._data is None:
+            return {}
+        return json.loads(self._data) if try_json else self._data
+
+    def update(self, item_properties=None, data=None, thumbnail=None, metadata=None):
+        self._backend._request('item.update', self.id)
+        for key, value in dict(item_properties or {}).items():
+            if key == 'text':
+                self._set_data(value)
+            elif key in ('typeKeywords', 'typekeywords', 'tags'):
+                setattr(self, 'typeKeywords' if key.lower() == 'typekeywords' else key, _as_list(value))
+            elif key == 'properties':
+                self.properties = PropertyMap(value or {})
+            elif isinstance(value, (str, int, float, bool)) or value is None:
+                setattr(self, key, value)
+        if data is not None:
+            self._set_data(data)
+        self.modified = int(time.time() * 1000)
+        return True
+
+    @property
+    def shared_with(self):
+        self._backend._request('item.shared_with', self.id)
+        groups = [self._backend._groups[g] for g in sorted(self._groups) if g in self._backend._groups]
+        return {'everyone': self._everyone, 'org': self._org, 'groups': groups}
+
+    def share(self, everyone=False, org=False, groups=None, allow_members_to_edit=False):
+        self._backend._request('item.share', self.id)
+        self._share_state(everyone, org, groups)
+        return {'results': [{'itemId': self.id, 'success': True, 'notSharedWith': []}]}
+
+    def unshare(self, groups):
+        self._backend._request('item.unshare', self.id)
+        for group in _as_list(groups):
+            self._groups.discard(_group_id(group))
+        self._set_access()
+        return {'notUnsharedFrom': []}
+
+    def protect(self, enable=True):
+        self._backend._request('item.protect', self.id)
+        self.protected = enable
+        return {'success': True}
+
+    def delete(self, force=False, dry_run=False, permanent=False):
+        self._backend._request('item.delete', self.id)
+        if self.protected:
+            raise FakeBackendError('Unable to delete item. Delete protection is turned on.')
+        self._backend._items.pop(self.id, None)
+        return True
+
+    def reassign_to(self, target_owner, target_folder=None):
+        self._backend._request('item.reassign_to', self.id)
+        self.owner = target_owner
+        return True
+
+
+class FakeGroup(object):
+    '''
+    Stand-in for `arcgis.gis.Group`.
+    '''
+    def __init__(self, backend, group_properties, owner=None):
+        self._backend = backend
+        self.id = group_properties.get('id') or _new_id()
+        self.title = group_properties.get('title', '')
+        self.tags = _as_list(group_properties.get('tags'))
+        self.access = group_properties.get('access', 'private')
+        self.snippet = group_properties.get('snippet')
+        self.owner = owner or backend.username
+        self._protected = False
+        self._members = {'owner': self.owner, 'admins': [self.owner], 'users': []}
+
+    def __repr__(self):
+        return '<FakeGroup title:"%s">' % self.title
+
+    @property
+    def protected(self):
+        return self._protected
+
+    @protected.setter
+    def protected(self, value):
+        self._backend._request('group.protect', self.id)
+        self._protected = value
+
+    def content(self, max_items=1000):
+        items = [item for item in list(self._backend._items.values()) if self.id in item._groups]
+        for _ in range(max(1, math.ceil(min(len(items), max_items) / 100))):
+            self._backend._request('group.content', self.id)
+        return items[:max_items]
+
+    def get_members(self):
+        self._backend._request('group.members', self.id)
+        return copy.deepcopy(self._members)
+
+    def add_users(self, usernames=None, admins=None):
+        self._backend._request('group.add_users', self.id)
+        self._members['users'].extend(_as_list(usernames))
+        return {'notAdded': []}
+
+    def update(self, **kwargs):
+        self._backend._request('group.update', self.id)
+        for key, value in kwargs.items():
+            if value is not None:
+                setattr(self, key, value)
+        return True
+
+    def reassign_to(self, target_owner):
+        self._backend._request('group.reassign_to', self.id)
+        self.owner = target_owner
+        return True
+
+    def delete(self):
+        self._backend._request('group.delete', self.id)
+        if self._protected:
+            raise FakeBackendError('Unable to delete group. Delete protection is turned on.')
+        self._backend._groups.pop(self.id, None)
+        return True
+
+
+class FakeUser(object):
+    '''
+    Stand-in for `arcgis.gis.User`.
+    '''
+    def __init__(self, username, role='org_admin'):
+        self.username = username
+        self.role = role
+        self.fullName = username.title()
+        self.email = username + '@example.com'
+        self.culture = 'en-us'
+
+
+class FakeUserManager(object):
+    '''
+    Stand-in for `GIS.users`. The signed-in user is cached, as in arcgis.
+    '''
+    def __init__(self, backend):
+        self._backend = backend
+
+    @property
+    def me(self):
+        return self._backend._users[self._backend.username]
+
+    def get(self, username):
+        self._backend._request('users.get', username)
+        return self._backend._users.get(username)
+
+
+class FakeGroupManager(object):
+    '''
+    Stand-in for `GIS.groups`.
+    '''
+    def __init__(self, backend):
+        self._backend = backend
+
+    def get(self, groupid):
+        self._backend._request('groups.get', groupid)
+        return self._backend._groups.get(groupid)
+
+    def create_from_dict(self, dict):
+        self._backend._request('groups.create')
+        return self._backend.add_group(**dict)
+
+
+class FakeContentManager(object):
+    '''
+    Stand-in for `GIS.content`.
+    '''
+    def __init__(self, backend):
+        self._backend = backend
+
+    def get(self, itemid):
+        self._backend._request('content.get', itemid)
+        return self._backend._items.get(itemid)
+
+    def _matches(self, query, sort_field=None, sort_order=None):
+        predicate = _parse(_tokenize(query))
+        items = [item for item in list(self._backend._items.values()) if predicate(item)]
+        if sort_field:
+            #text sorts case insensitively, items without a value come last
+            descending = sort_order in ('desc', 'descending')
+
+            def _key(item):
+                value = getattr(item, sort_field, None)
+                value = value.lower() if isinstance(value, str) else value
+                return (value is not None, value) if descending else (value is None, value)
+            items.sort(key=_key, reverse=descending)
+        return items
+
+    def search(self, query, item_type=None, sort_field=None, sort_order=None, max_items=10, outside_org=False, **kwargs):
+        items = self._matches(query, sort_field, sort_order)
+        if item_type:
+            items = [item for item in items if item.type == item_type]
+        items = items[:max_items]
+        #arcgis pages through the results 100 at a time
+        for _ in range(max(1, math.ceil(len(items) / 100))):
+            self._backend._request('content.search', query)
+        return items
+
+    def advanced_search(self, query, return_count=False, max_items=100, start=1, sort_field='title', sort_order='asc', **kwargs):
+        items = self._matches(query, sort_field, sort_order)
+        for _ in range(max(1, math.ceil(min(max_items, 100) / 100))):
+            self._backend._request('content.search', query)
+        if return_count:
+            return len(items)
+        page = items[start-1:start-1+max_items]
+        next_start = start + max_items if start - 1 + max_items < len(items) else -1
+        return {'query': query, 'total': len(items), 'start': start, 'num': max_items,
+                'nextStart': next_start, 'results': page}
+
+    def add(self, item_properties, data=None, thumbnail=None, metadata=None, owner=None, folder=None, **kwargs):
+        self._backend._request('content.add')
+        item = FakeItem(self._backend, dict(item_properties), data=data, owner=owner)
+        self._backend._items[item.id] = item
+        return item
+
+    def share_items(self, items, everyone=False, org=False, groups=None, allow_members_to_edit=False):
+        self._backend._request('content.share_items')
+        for item in items:
+            item._share_state(everyone, org, groups)
+        return {'results': [{'itemId': item.id, 'success': True, 'notSharedWith': []} for item in items]}
+
+    def unshare_items(self, items, groups=None, everyone=None, org=None):
+        self._backend._request('content.unshare_items')
+        for item in items:
+            for group in _as_list(groups):
+                item._groups.discard(_group_id(group))
+            item._set_access()
+        return {'results': [{'itemId': item.id, 'success': True, 'notUnsharedFrom': []} for item in items]}
+
+
+class FakePortal(object):
+    '''
+    Stand-in for `GIS._portal`.
+    '''
+    def __init__(self, is_arcgisonline):
+        self.is_arcgisonline = is_arcgisonline
+
+
+class FakeConnection(object):
+    '''
+    Stand-in for `GIS._con`. REST calls are answered by the backend router and
+    error responses are raised, as the arcgis connection does.
+    '''
+    def __init__(self, backend):
+        self._backend = backend
+        self.token = self._token = 'fake-token'
+        self._referer = 'http'
+        self._session = requests.Session()
+        backend.mount(self._session)
+
+    def _call(self, method, path, params):
+        status, body = self._backend.route(method, path, params or {})
+        if status >= 400:
+            raise FakeBackendError('%s %s failed with %s: %s' % (method, path, status, body))
+        return body
+
+    def get(self, path, params=None, headers=None, **kwargs):
+        return self._call('GET', path, params)
+
+    def post(self, path, postdata=None, headers=None, **kwargs):
+        return self._call('POST', path, postdata)
+
+
+class FakeGIS(object):
+    '''
+    Stand-in for `arcgis.gis.GIS`.
+    '''
+    def __init__(self, backend, url, is_arcgisonline):
+        self._backend = backend
+        self.url = url
+        self._portal = FakePortal(is_arcgisonline)
+        self._con = FakeConnection(backend)
+        self.content = FakeContentManager(backend)
+        self.groups = FakeGroupManager(backend)
+        self.users = FakeUserManager(backend)
+        self.properties = backend.properties
+        self.hub = None
+
+    def map(self, *args, **kwargs):
+        return PropertyMap({'layers': []})
+
+
+#HTTP stand-in
+
+#operation name suffix of the discussions API verbs
+_VERBS = {'GET': 'get', 'POST': 'add', 'PATCH': 'update', 'DELETE': 'delete'}
+
+class FakeAdapter(BaseAdapter):
+    '''
+    Transport adapter answering the requests of a requests session from the
+    backend router instead of the network.
+    '''
+    def __init__(self, backend):
+        super(FakeAdapter, self).__init__()
+        self._backend = backend
+
+    def send(self, request, **kwargs):
+        parsed = urlparse(request.url)
+        params = dict(parse_qsl(parsed.query))
+        body = request.body
+        if body:
+            if isinstance(body, bytes):
+                body = body.decode()
+            try:
+                params.update(json.loads(body))
+            except ValueError:
+                params.update(dict(parse_qsl(body)))
+        status, payload = self._backend.route(request.method, unquote(parsed.path), params)
+        response = requests.Response()
+        response.status_code = status
+        response._content = json.dumps(payload).encode()
+        response.headers['Content-Type'] = 'application/json'
+        response.encoding = 'utf-8'
+        response.url = request.url
+        response.request = request
+        return response
+
+    def close(self):
+        pass
+
+
+class FakeBackend(object):
+    '''
+    In-process stand-in for the Portal, Hub domains, Hub events and Hub
+    discussions APIs.
+
+    ================    ===============================================================
+    **Argument**        **Description**
+    ----------------    ---------------------------------------------------------------
+    latency             Optional float. Seconds every request takes. Default is 0.
+    ----------------    ---------------------------------------------------------------
+    latencies           Optional dictionary of operation name to seconds, overriding
+                        `latency` for those operations.
+    ----------------    ---------------------------------------------------------------
+    failure_rate        Optional float between 0 and 1. Probability that any request
+                        fails. Default is 0.
+    ----------------    ---------------------------------------------------------------
+    failures            Optional dictionary of operation name to failure probability,
+                        overriding `failure_rate` for those operations.
+    ----------------    ---------------------------------------------------------------
+    seed                Optional integer. Seed of the failure injection. Default is 0.
+    ----------------    ---------------------------------------------------------------
+    is_arcgisonline     Optional boolean. Default is True. False behaves as Enterprise.
+    ----------------    ---------------------------------------------------------------
+    hub_enabled         Optional boolean. Default is True (Hub Premium).
+    ================    ===============================================================
+    '''
+    def __init__(self, latency=0.0, latencies=None, failure_rate=0.0, failures=None, seed=0,
+                 is_arcgisonline=True, hub_enabled=True, url_key='fakeorg', username='admin'):
+        self.latency = latency
+        self.latencies = dict(latencies or {})
+        self.failure_rate = failure_rate
+        self.failures = dict(failures or {})
+        self.username = username
+        self.url_key = url_key
+        self.org_id = 'fakeOrgId'
+        self._random = random.Random(seed)
+        self._forced_failures = Counter()
+        self._lock = threading.Lock()
+        self._log = []
+        self._object_ids = itertools.count(1)
+        self._items = {}
+        self._groups = {}
+        self._users = {username: FakeUser(username)}
+        self._domains = {}
+        self._events = {}
+        self._posts = {}
+        self._channels = {}
+        self._reactions = {}
+        portal_properties = {}
+        if hub_enabled:
+            portal_properties['hub'] = {'enabled': True, 'settings': {'enterpriseOrg': {'orgId': self.org_id}}}
+        self.properties = PropertyMap({
+            'id': self.org_id,
+            'name': 'Fake Org',
+            'urlKey': url_key,
+            'user': {'username': username, 'culture': 'en-us'},
+            'defaultBasemap': {'title': 'Topographic', 'baseMapLayers': []},
+            'defaultExtent': {'xmin': -1, 'ymin': -1, 'xmax': 1, 'ymax': 1, 'spatialReference': {'wkid': 102100}},
+            'portalProperties': portal_properties,
+            'subscriptionInfo': {'companionOrganizations': [{'organizationUrl': url_key + '.maps.arcgis.com'}]},
+        })
+        url = 'https://%s.maps.arcgis.com' % url_key if is_arcgisonline else 'https://fake.example.com/portal/'
+        self.gis = FakeGIS(self, url, is_arcgisonline)
+
+    #Request accounting, latency and failure injection
+
+    def _request(self, operation, detail=None):
+        with self._lock:
+            self._log.append((operation, detail))
+            forced = self._forced_failures[operation] > 0
+            if forced:
+                self._forced_failures[operation] -= 1
+            rate = self.failures.get(operation, self.failure_rate)
+            failed = forced or (rate > 0 and self._random.random() < rate)
+        delay = self.latencies.get(operation, self.latency)
+        if delay:
+            time.sleep(delay)
+        if failed:
+            raise FakeBackendError('Injected failure for %s' % operation)
+
+    def fail_next(self, operation, times=1):
+        '''
+        Makes the next `times` requests for an operation fail.
+        '''
+        with self._lock:
+            self._forced_failures[operation] += times
+
+    @property
+    def request_count(self):
+        '''
+        Returns the number of requests made since the last reset.
+        '''
+        return len(self._log)
+
+    def counts(self):
+        '''
+        Returns a Counter of requests per operation since the last reset.
+        '''
+        with self._lock:
+            return Counter(operation for operation, _ in self._log)
+
+    def requests(self):
+        '''
+        Returns the (operation, detail) log of requests since the last reset.
+        '''
+        with self._lock:
+            return list(self._log)
+
+    def reset(self):
+        '''
+        Clears the request log.
+        '''
+        with self._lock:
+            self._log = []
+
+    #Connecting the package
+
+    def mount(self, session):
+        '''
+        Routes all requests of a requests session to this backend.
+        '''
+        adapter = FakeAdapter(self)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    def hub(self, **kwargs):
+        '''
+        Returns an arcgishub Hub connected to this backend.
+        '''
+        hub = Hub(gis=self.gis, **kwargs)
+        self.gis.hub = hub
+        self.mount(hub._http_session)
+        return hub
+
+    @property
+    def hub_environment(self):
+        if 'devext' in self.gis.url:
+            return 'hubdev.arcgis.com'
+        elif 'mapsqa' in self.gis.url or 'qaext' in self.gis.url:
+            return 'hubqa.arcgis.com'
+        return 'hub.arcgis.com'
+
+    #Seeding, no requests are recorded
+
+    def add_user(self, username, role='org_user'):
+        self._users[username] = FakeUser(username, role)
+        return self._users[username]
+
+    def add_group(self, title, **group_properties):
+        group_properties['title'] = title
+        group = FakeGroup(self, group_properties)
+        self._groups[group.id] = group
+        return group
+
+    def add_item(self, title, type='Feature Service', typeKeywords=None, data=None, groups=None, **item_properties):
+        item_properties.update({'title': title, 'type': type, 'typeKeywords': typeKeywords or []})
+        item = FakeItem(self, item_properties, data=data)
+        item._share_state(groups=groups)
+        self._items[item.id] = item
+        return item
+
+    def add_domain(self, hostname, site_id, site_title=''):
+        record = {
+            'id': str(len(self._domains) + 1),
+            'hostname': hostname,
+            'siteId': site_id,
+            'siteTitle': site_title,
+            'clientKey': _new_id()[:16],
+            'orgId': self.org_id,
+            'orgKey': self.url_key,
+            'orgTitle': 'Fake Org',
+            'sslOnly': True,
+        }
+        self._domains[record['id']] = record
+        return record
+
+    def add_page(self, title, sites=None):
+        '''
+        Adds a page item, linked both ways to the given site items.
+        '''
+        data = _load_store('pages-data.json')
+        page = self.add_item(title, type='Hub Page', typeKeywords=['Hub', 'hubPage'], data=data)
+        for site in sites or []:
+            self.link(page, site)
+        return page
+
+    def link(self, page, site):
+        page_data = json.loads(page._data)
+        page_data['values']['sites'].append({'id': site.id, 'title': site.title})
+        page._set_data(page_data)
+        site_data = json.loads(site._data)
+        site_data['values']['pages'].append({'id': page.id, 'title': page.title, 'slug': page.title.replace(' ', '-').lower()})
+        site._set_data(site_data)
+
+    def add_site(self, title, pages=0, catalog_groups=1, catalog_items=0, item_type='Feature Service', initiative=None):
+        '''
+        Adds a site with its content and core team groups, a domain record,
+        `pages` linked pages and `catalog_items` items shared across
+        `catalog_groups` catalog groups.
+        '''
+        subdomain = title.replace(' ', '-').lower()
+        hostname = '%s-%s.%s' % (subdomain, self.url_key, self.hub_environment)
+        content_group = self.add_group(title + ' Content', tags=['Hub Group', 'Hub Content Group'])
+        collab_group = self.add_group(title + ' Core Team', tags=['Hub Group', 'Hub Core Team Group'])
+        groups = [content_group] + [self.add_group('%s Catalog %d' % (title, n)) for n in range(1, catalog_groups)]
+        data = _load_store('init-sites-data.json' if initiative else 'sites-data.json')
+        data['catalog']['groups'] = [group.id for group in groups]
+        data['values']['title'] = title
+        data['values']['subdomain'] = subdomain
+        data['values']['defaultHostname'] = hostname
+        properties = {'contentGroupId': content_group.id, 'collaborationGroupId': collab_group.id, 'children': []}
+        if initiative is not None:
+            properties['parentInitiativeId'] = initiative.id
+            properties['followersGroupId'] = initiative.properties['followersGroupId']
+        site = self.add_item(title, type='Hub Site Application', data=data,
+                             typeKeywords=['Hub', 'hubSite', 'hubSolution', 'Registered App'],
+                             url='https://' + hostname, properties=properties, groups=[collab_group])
+        self.add_domain(hostname, site.id, title)
+        for n in range(pages):
+            self.add_page('%s Page %d' % (title, n + 1), sites=[site])
+        for n in range(catalog_items):
+            self.add_item('%s Dataset %d' % (title, n + 1), type=item_type, groups=[groups[n % len(groups)]])
+        return site
+
+    def add_initiative(self, title, indicators=0, site=True, solutions=1, available=0, **site_options):
+        '''
+        Adds an initiative with its groups, `indicators` indicators and, unless
+        site is False, its site. The indicators are spread over `solutions`
+        solution templates of the initiative template, which also offer
+        `available` indicators that are not added to the initiative.
+        '''
+        content_group = self.add_group(title + ' Content')
+        collab_group = self.add_group(title + ' Core Team')
+        followers_group = self.add_group(title + ' Followers')
+        template = self.add_item(title + ' Template', type='Hub Initiative Template', data={'steps': []})
+        solution_items = [self.add_item('%s Solution %d' % (title, n + 1), type='Solution', data={'indicators': []})
+                          for n in range(max(1, solutions))]
+        template._set_data({'steps': [{'id': 'monitorTools', 'templateIds': [solution.id for solution in solution_items],
+                                       'itemIds': []}]})
+        indicator_list = []
+        for n in range(indicators + available):
+            layer = self.add_item('%s Indicator %d' % (title, n + 1), type='Feature Service')
+            indicator_list.append({
+                'id': 'indicator%d' % (n + 1), 'type': 'Data', 'optional': False,
+                'source': {'url': 'https://fake/%s/FeatureServer/0' % layer.id, 'itemId': layer.id,
+                           'name': layer.title, 'mappings': []},
+            })
+        for n, solution in enumerate(solution_items):
+            solution._set_data({'indicators': [dict(i, source={}) for i in indicator_list[n::len(solution_items)]]})
+        indicator_list = indicator_list[:indicators]
+        data = {'source': template.id, 'steps': [{'id': 'informTools', 'templateIds': [], 'itemIds': []}],
+                'indicators': indicator_list, 'values': {}}
+        properties = {'contentGroupId': content_group.id, 'collaborationGroupId': collab_group.id,
+                      'followersGroupId': followers_group.id}
+        initiative = self.add_item(title, type='Hub Initiative', typeKeywords=['Hub', 'hubInitiative'],
+                                   data=data, properties=properties, groups=[collab_group])
+        if site:
+            site_item = self.add_site(title, initiative=initiative, **site_options)
+            data['steps'][0]['itemIds'] = [site_item.id]
+            initiative._set_data(data)
+            initiative.properties['siteId'] = site_item.id
+            initiative.url = site_item.url
+        return initiative
+
+    def add_event(self, title, initiative_id='', **attributes):
+        object_id = next(self._object_ids)
+        feature = {
+            'attributes': dict({
+                'OBJECTID': object_id, 'title': title, 'venue': 'Venue %d' % object_id,
+                'address1': '%d Main St' % object_id, 'initiativeId': initiative_id,
+                'organizers': '[]', 'description': '', 'startDate': 0, 'endDate': 0,
+                'Creator': self.username, 'capacity': 0, 'attendance': 0, 'status': 'public',
+                'groupId': '', 'isCancelled': 0,
+            }, **attributes),
+            'geometry': {'x': 0.0, 'y': 0.0},
+        }
+        self._events[object_id] = feature
+        return feature
+
+    def add_channel(self, access='public', groups=None, **properties):
+        channel = dict({'id': _new_id(), 'access': access, 'groups': groups or [], 'orgs': [self.org_id],
+                        'allowReply': True, 'allowAnonymous': False, 'softDelete': True,
+                        'defaultPostStatus': 'approved', 'allowReaction': True, 'allowedReactions': None,
+                        'creator': self.username, 'editor': None, 'createdAt': '', 'updatedAt': ''}, **properties)
+        self._channels[channel['id']] = channel
+        return channel
+
+    def add_post(self, body, title=None, channel_id=None, **properties):
+        post = dict({'id': _new_id(), 'title': title, 'body': body, 'discussion': None,
+                     'creator': self.username, 'editor': None, 'createdAt': '', 'updatedAt': '',
+                     'status': 'approved', 'geometry': None, 'appInfo': None, 'channelId': channel_id,
+                     'parentId': None}, **properties)
+        self._posts[post['id']] = post
+        return post
+
+    #REST routing
+
+    def route(self, method, path, params):
+        '''
+        Answers a Hub API request. Returns a (status code, JSON body) tuple.
+        '''
+        url = urlparse(path)
+        path = url.path
+        if url.query:
+            params = dict(parse_qsl(url.query), **params)
+        for pattern, handler in self._routes():
+            match = re.search(pattern, path)
+            if match:
+                operation, responder = handler
+                operation = operation.format(*match.groups(), method=_VERBS.get(method, method.lower()))
+                try:
+                    self._request(operation, path)
+                except FakeBackendError as e:
+                    return 500, {'error': {'code': 500, 'message': str(e)}}
+                with self._lock:
+                    return responder(method, params, *match.groups())
+        return 404, {'error': {'code': 404, 'message': 'Not found: ' + path}}
+
+    def _routes(self):
+        return [
+            (r'/api/v3/domains/?$', ('domains.{method}', self._domains_collection)),
+            (r'/api/v3/domains/([^/]+)$', ('domains.{method}', self._domain)),
+            (r'/FeatureServer/0/query$', ('events.query', self._events_query)),
+            (r'/FeatureServer/0/addFeatures$', ('events.add', self._events_add)),
+            (r'/FeatureServer/0/updateFeatures$', ('events.update', self._events_update)),
+            (r'/FeatureServer/0/deleteFeatures$', ('events.delete', self._events_delete)),
+            (r'/FeatureServer/0/(\d+)$', ('events.get', self._event)),
+            (r'/api/discussions/v1/(posts|channels|reactions)/?$', ('discussions.{0}.{method}', self._discussions_collection)),
+            (r'/api/discussions/v1/(posts|channels|reactions)/([^/]+)$', ('discussions.{0}.{method}', self._discussions_resource)),
+        ]
+
+    def _domains_collection(self, method, params):
+        if method == 'POST':
+            if any(d['hostname'] == params.get('hostname') for d in self._domains.values()):
+                return 409, {'error': {'code': 409, 'message': 'Hostname is already registered'}}
+            record = self.add_domain(params['hostname'], params.get('siteId'), params.get('siteTitle', ''))
+            return 200, record
+        filters = {k: v for k, v in params.items() if k in ('siteId', 'orgId', 'clientKey', 'hostname')}
+        records = [d for d in self._domains.values() if all(d.get(k) == v for k, v in filters.items())]
+        return 200, records
+
+    def _domain(self, method, params, key):
+        if method == 'DELETE':
+            if self._domains.pop(key, None) is None:
+                return 404, {'error': {'code': 404, 'message': 'Domain not found'}}
+            return 200, {'success': True}
+        for record in self._domains.values():
+            if record['hostname'] == key or record['id'] == key:
+                return 200, record
+        return 404, {'error': {'code': 404, 'message': 'Domain not found'}}
+
+    @staticmethod
+    def _features(params):
+        features = params.get('features', [])
+        return json.loads(features) if isinstance(features, str) else features
+
+    def _events_query(self, method, params):
+        features = sorted(self._events.values(), key=lambda f: f['attributes']['OBJECTID'])
+        where = params.get('where', '1=1')
+        match = re.match(r"\s*(\w+)\s*=\s*'?([^']*)'?\s*$", where)
+        if where != '1=1' and match:
+            field, value = match.groups()
+            features = [f for f in features if str(f['attributes'].get(field)) == value]
+        if params.get('returnCountOnly') in (True, 'true'):
+            return 200, {'count': len(features)}
+        offset = int(params.get('resultOffset', 0))
+        count = params.get('resultRecordCount')
+        end = offset + int(count) if count else None
+        return 200, {'features': copy.deepcopy(features[offset:end])}
+
+    def _events_add(self, method, params):
+        results = []
+        for feature in self._features(params):
+            object_id = next(self._object_ids)
+            feature['attributes']['OBJECTID'] = object_id
+            self._events[object_id] = copy.deepcopy(feature)
+            results.append({'objectId': object_id, 'success': True})
+        return 200, {'addResults': results}
+
+    def _events_update(self, method, params):
+        results = []
+        for feature in self._features(params):
+            object_id = feature['attributes']['OBJECTID']
+            success = object_id in self._events
+            if success:
+                self._events[object_id]['attributes'].update(feature['attributes'])
+            results.append({'objectId': object_id, 'success': success})
+        return 200, {'updateResults': results}
+
+    def _events_delete(self, method, params):
+        results = []
+        for object_id in str(params.get('objectIds', '')).split(','):
+            success = self._events.pop(int(object_id), None) is not None
+            results.append({'objectId': int(object_id), 'success': success})
+        return 200, {'deleteResults': results}
+
+    def _event(self, method, params, object_id):
+        feature = self._events.get(int(object_id))
+        if feature is None:
+            return 404, {'error': {'code': 404, 'message': 'Feature not found'}}
+        return 200, {'feature': copy.deepcopy(feature)}
+
+    def _discussions_store(self, resource):
+        return {'posts': self._posts, 'channels': self._channels, 'reactions': self._reactions}[resource]
+
+    def _discussions_collection(self, method, params, resource):
+        store = self._discussions_store(resource)
+        if method == 'POST':
+            record = dict(params, id=_new_id(), creator=self.username, createdAt='', updatedAt='')
+            if resource == 'posts':
+                record = dict(self.add_post(params.get('body')), **record)
+            elif resource == 'channels':
+                record = dict(self.add_channel(), **record)
+            store[record['id']] = record
+            return 200, record
+        records = list(store.values())
+        start = int(params.get('start', 1))
+        num = int(params.get('num', 20))
+        return 200, {'items': records[start-1:start-1+num], 'total': len(records),
+                     'nextStart': start + num if start - 1 + num < len(records) else -1}
+
+    def _discussions_resource(self, method, params, resource, key):
+        store = self._discussions_store(resource)
+        if key not in store:
+            return 404, {'statusCode': 404, 'message': 'Not found', 'success': False}
+        if method == 'DELETE':
+            del store[key]
+            return 200, {'success': True}
+        if method == 'PATCH':
+            store[key].update(params)
+        return 200, store[key]
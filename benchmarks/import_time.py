@@ -0,0 +1,88 @@
+'''
+Import-time benchmark guarding the cold-start latency of `arcgishub.hub`.
+
+Every measurement runs in a fresh interpreter. The time spent importing the
+`arcgis` modules the package cannot do without is measured separately and
+subtracted, so the budget only covers what arcgishub adds on top of it.
+The benchmark also fails if importing `arcgishub.hub` pulls in any of the
+modules that are deferred until first use.
+
+Usage:
+
+    python benchmarks/import_time.py [--runs 5] [--budget 0.25]
+'''
+import argparse
+import json
+import statistics
+import subprocess
+import sys
+
+#Modules arcgishub must not import before they are first needed
+DEFERRED_MODULES = [
+    'pandas',
+    'matplotlib',
+    'matplotlib.pyplot',
+    'seaborn',
+    'arcgis.geocoding',
+    'arcgis.features',
+    'arcgis.features.enrich_data',
+]
+
+#The arcgis modules imported at load time by the package
+BASELINE_IMPORTS = 'import arcgis.gis, arcgis._impl.common._mixins, arcgis._impl.common._isd'
+
+_PROBE = '''
+import json, sys, time
+start = time.perf_counter()
+{imports}
+elapsed = time.perf_counter() - start
+print(json.dumps({{"elapsed": elapsed, "modules": sorted(sys.modules)}}))
+'''
+
+def _probe(imports):
+    '''
+    Runs the imports in a fresh interpreter, returns the elapsed seconds and
+    the names of the loaded modules.
+    '''
+    output = subprocess.check_output([sys.executable, '-c', _PROBE.format(imports=imports)])
+    result = json.loads(output.decode().strip().splitlines()[-1])
+    return result['elapsed'], set(result['modules'])
+
+def run(runs=5, budget=0.25):
+    '''
+    Measures the import time of `arcgishub.hub` on top of its arcgis baseline.
+    Returns a list of failure messages, empty if the benchmark passed.
+    '''
+    failures = []
+    baseline_times, hub_times = [], []
+    baseline_modules, hub_modules = set(), set()
+    for _ in range(runs):
+        elapsed, baseline_modules = _probe(BASELINE_IMPORTS)
+        baseline_times.append(elapsed)
+        elapsed, hub_modules = _probe('import arcgishub.hub')
+        hub_times.append(elapsed)
+    baseline = statistics.median(baseline_times)
+    total = statistics.median(hub_times)
+    overhead = max(0.0, total - baseline)
+    print('arcgis baseline:   %.3fs' % baseline)
+    print('arcgishub.hub:     %.3fs' % total)
+    print('arcgishub overhead %.3fs (budget %.3fs)' % (overhead, budget))
+    if overhead > budget:
+        failures.append('arcgishub.hub adds %.3fs to import time, budget is %.3fs' % (overhead, budget))
+    eager = [m for m in DEFERRED_MODULES if m in hub_modules and m not in baseline_modules]
+    if eager:
+        failures.append('arcgishub.hub imports deferred modules eagerly: ' + ', '.join(eager))
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--runs', type=int, default=5, help='number of cold imports to measure')
+    parser.add_argument('--budget', type=float, default=0.25, help='allowed seconds on top of the arcgis baseline')
+    args = parser.parse_args()
+    failures = run(args.runs, args.budget)
+    for failure in failures:
+        print('FAIL: ' + failure)
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,325 @@
+'''
+Request-count, latency and memory benchmarks for the arcgishub managers.
+
+Every scenario seeds a fresh `FakeBackend`, runs one manager operation
+against it and records:
+
+* requests: the number of round trips the operation made,
+* serial:   the wall time divided by the simulated per-request latency,
+            i.e. the length of the chain of requests the caller waited on,
+* seconds:  the wall time,
+* peak:     the peak memory allocated while the operation ran (tracemalloc).
+
+A scenario fails when it raises, when its request count exceeds
+`max_requests` or when its serial round trips exceed `max_serial` (with
+SERIAL_TOLERANCE for the CPU time of the operation). Round trips are what
+hurts against the real services, so budgets are counted in round trips
+rather than in seconds that depend on the machine the suite runs on. When
+an optimization lowers a count, lower its budget in SCENARIOS with it.
+
+Usage:
+
+    python benchmarks/operations.py [--latency 0.02] [-k site.] [--json results.json]
+'''
+from fake_backend import FakeBackend
+from collections import namedtuple
+import argparse
+import json
+import sys
+import time
+import tracemalloc
+
+Scenario = namedtuple('Scenario', ['name', 'setup', 'max_requests', 'max_serial', 'premium'])
+
+#Seeding sizes
+PAGES = 20
+CATALOG_ITEMS = 300
+CATALOG_GROUPS = 3
+SITES = 50
+INITIATIVES = 20
+INDICATORS = 10
+SOLUTIONS = 5
+EVENTS = 200
+POSTS = 50
+CONTENT_ITEMS = 500
+
+#Slack on the serial round trip budget for time not spent waiting on requests
+SERIAL_TOLERANCE = 1.25
+
+#Scenario setups: seed the backend, return the operation to measure
+
+def _sites_add(backend, hub):
+    return lambda: hub.sites.add('Benchmark Site')
+
+def _sites_clone(backend, hub):
+    site = hub.sites.get(backend.add_site('Source Site', pages=PAGES).id)
+    return lambda: hub.sites.clone(site, pages=True, title='Cloned Site')
+
+def _sites_search(backend, hub):
+    for n in range(SITES):
+        backend.add_site('Site %d' % n)
+    return lambda: hub.sites.search()
+
+def _sites_get_by_domain(backend, hub):
+    site = backend.add_site('Domain Site')
+    return lambda: hub.sites.get_by_domain(site.url)
+
+def _sites_get_by_domain_cached(backend, hub):
+    site = backend.add_site('Domain Site')
+    hub.sites.get_by_domain(site.url)
+
+    def _resolve():
+        for _ in range(SITES):
+            hub.sites.get_by_domain(site.url)
+    return _resolve
+
+def _sites_domains(backend, hub):
+    for n in range(SITES):
+        backend.add_site('Site %d' % n)
+    names = ['site-%d' % n for n in range(2 * SITES)]
+
+    def _check_names():
+        registry = hub.sites.domains
+        return [name for name in names if registry.is_available(name)]
+    return _check_names
+
+def _site_search(backend, hub):
+    site = hub.sites.get(backend.add_site('Catalog Site', catalog_items=CATALOG_ITEMS, catalog_groups=CATALOG_GROUPS).id)
+    return lambda: site.search()
+
+def _site_update_unchanged(backend, hub):
+    site = hub.sites.get(backend.add_site('Config Site').id)
+    layout, theme = site.layout, site.theme
+
+    def _reapply():
+        site.update(site_properties={'title': site.title}, subdomain=site.definition['values']['subdomain'])
+        site.update_layout(layout)
+        site.update_theme(theme)
+    return _reapply
+
+def _site_add_content(backend, hub):
+    site = hub.sites.get(backend.add_site('Library Site').id)
+    other = backend.add_group('Other Group')
+    itemids = []
+    for n in range(CONTENT_ITEMS):
+        item = backend.add_item('Dataset %d' % n, groups=[other] if n % 5 == 0 else None)
+        item._share_state(everyone=n % 2 == 0)
+        itemids.append(item.id)
+    return lambda: site.add_content(itemids)
+
+def _site_delete(backend, hub):
+    site = hub.sites.get(backend.add_site('Doomed Site', pages=PAGES).id)
+    return lambda: site.delete()
+
+def _site_reassign_to(backend, hub):
+    site_item = backend.add_site('Handover Site', pages=PAGES)
+    core_team = backend._groups[site_item.properties['collaborationGroupId']]
+    for n in range(CONTENT_ITEMS):
+        backend.add_item('Team Dataset %d' % n, groups=[core_team])
+    backend.add_user('successor', role='org_admin')
+    site = hub.sites.get(site_item.id)
+    return lambda: site.reassign_to('successor')
+
+def _pages_link(backend, hub):
+    site = hub.sites.get(backend.add_site('Link Site').id)
+    page = site.pages.get(backend.add_page('Loose Page').id)
+    return lambda: site.pages.link(page)
+
+def _pages_unlink(backend, hub):
+    site_item = backend.add_site('Unlink Site')
+    other = backend.add_site('Other Site')
+    page_item = backend.add_page('Shared Page', sites=[site_item, other])
+    site = hub.sites.get(site_item.id)
+    page = site.pages.get(page_item.id)
+    return lambda: site.pages.unlink(page)
+
+def _pages_batch(backend, hub):
+    source = hub.sites.get(backend.add_site('Source Site', pages=PAGES).id)
+    target = hub.sites.get(backend.add_site('Target Site').id)
+    pages = source.pages.search(prefetch=True)
+
+    def _move_pages():
+        with hub.batch():
+            for page in pages:
+                target.pages.link(page)
+                source.pages.unlink(page)
+    return _move_pages
+
+def _pages_clone(backend, hub):
+    site = hub.sites.get(backend.add_site('Clone Site', pages=1).id)
+    page = site.pages.search(prefetch=True)[0]
+    return lambda: site.pages.clone(page)
+
+def _pages_search(backend, hub):
+    site = hub.sites.get(backend.add_site('Pages Site', pages=PAGES).id)
+    return lambda: site.pages.search()
+
+def _initiatives_add(backend, hub):
+    return lambda: hub.initiatives.add('Benchmark Initiative')
+
+def _initiatives_search(backend, hub):
+    for n in range(INITIATIVES):
+        backend.add_initiative('Initiative %d' % n)
+    return lambda: hub.initiatives.search()
+
+def _indicators_search(backend, hub):
+    initiative = hub.initiatives.get(backend.add_initiative('Indicator Initiative', indicators=INDICATORS).id)
+    return lambda: initiative.indicators.search()
+
+def _indicators_add(backend, hub):
+    initiative = hub.initiatives.get(backend.add_initiative('Indicator Initiative', solutions=SOLUTIONS,
+                                                           available=INDICATORS).id)
+
+    def _add_indicators():
+        for n in range(INDICATORS):
+            indicator = initiative.indicators.add({'id': 'indicator%d' % (n + 1), 'type': 'Data', 'optional': False})
+            if isinstance(indicator, str):
+                raise Exception(indicator)
+    return _add_indicators
+
+def _events_search(backend, hub):
+    for n in range(EVENTS):
+        backend.add_event('Event %d' % n)
+    return lambda: hub.events.search()
+
+def _events_add(backend, hub):
+    initiative = backend.add_initiative('Event Initiative')
+    for n in range(EVENTS):
+        backend.add_event('Event %d' % n, initiative_id=initiative.id)
+    event_properties = {
+        'title': 'Benchmark Event',
+        'description': 'Event added by the benchmark suite',
+        'initiativeId': initiative.id,
+        'venue': 'Town Hall',
+        'address1': '1 Main St',
+        'status': 'public',
+        'startDate': 1600000000000,
+        'endDate': 1600003600000,
+        'isAllDay': 0,
+        'geometry': {'x': 0.0, 'y': 0.0},
+    }
+    return lambda: hub.events.add(event_properties)
+
+def _posts_search(backend, hub):
+    for n in range(POSTS):
+        backend.add_post('Post %d' % n, title='Post %d' % n)
+    return lambda: hub.discussions.posts.search()
+
+#Budgets are the round trips each operation makes today
+SCENARIOS = [
+    Scenario('sites.add', _sites_add, 10, 10, False),
+    Scenario('sites.clone', _sites_clone, 90, 21, False),
+    Scenario('sites.search', _sites_search, 1, 1, True),
+    Scenario('sites.get_by_domain', _sites_get_by_domain, 2, 2, True),
+    Scenario('sites.get_by_domain_cached', _sites_get_by_domain_cached, 0, 0, True),
+    Scenario('sites.domains', _sites_domains, 1, 1, False),
+    Scenario('site.search', _site_search, 4, 4, True),
+    Scenario('site.update_unchanged', _site_update_unchanged, 0, 0, True),
+    Scenario('site.add_content', _site_add_content, 16, 20, True),
+    Scenario('site.delete', _site_delete, 74, 24, False),
+    Scenario('site.reassign_to', _site_reassign_to, 528, 78, True),
+    Scenario('pages.link', _pages_link, 4, 4, True),
+    Scenario('pages.unlink', _pages_unlink, 4, 4, True),
+    Scenario('pages.batch', _pages_batch, 23, 6, True),
+    Scenario('pages.clone', _pages_clone, 5, 4, True),
+    Scenario('pages.search', _pages_search, 2, 2, True),
+    Scenario('initiatives.add', _initiatives_add, 17, 17, True),
+    Scenario('initiatives.search', _initiatives_search, 1, 1, True),
+    Scenario('indicators.search', _indicators_search, 1, 1, True),
+    Scenario('indicators.add', _indicators_add, 37, 33, True),
+    Scenario('events.search', _events_search, 1, 1, True),
+    Scenario('events.add', _events_add, 6, 6, True),
+    Scenario('posts.search', _posts_search, 1, 1, True),
+]
+
+def _run_once(scenario, latency, trace_memory):
+    '''
+    Seeds a fresh backend for the scenario and runs its operation once.
+    Returns the backend, the wall time, the peak memory and the error raised.
+    '''
+    backend = FakeBackend(latency=latency, hub_enabled=scenario.premium)
+    hub = backend.hub()
+    operation = scenario.setup(backend, hub)
+    backend.reset()
+    if trace_memory:
+        tracemalloc.start()
+    start = time.perf_counter()
+    error = None
+    try:
+        operation()
+    except Exception as e:
+        error = '%s: %s' % (type(e).__name__, e)
+    seconds = time.perf_counter() - start
+    peak = None
+    if trace_memory:
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return backend, seconds, peak, error
+
+def measure(scenario, latency=0.02):
+    '''
+    Measures the scenario's operation. Time and requests are measured in one
+    run and peak memory in a second run without latency, since tracing
+    memory allocations slows the operation down.
+    Returns a dictionary of the measurements.
+    '''
+    backend, seconds, _, error = _run_once(scenario, latency, trace_memory=False)
+    _, _, peak, _ = _run_once(scenario, 0.0, trace_memory=True)
+    return {
+        'name': scenario.name,
+        'requests': backend.request_count,
+        'serial': seconds / latency if latency else None,
+        'seconds': seconds,
+        'peak_kb': peak / 1024.0,
+        'counts': dict(backend.counts()),
+        'error': error,
+    }
+
+def check(scenario, result):
+    '''
+    Returns the list of budget violations of a measured scenario.
+    '''
+    failures = []
+    if result['error']:
+        failures.append('%s raised %s' % (scenario.name, result['error']))
+    if result['requests'] > scenario.max_requests:
+        failures.append('%s made %d requests, budget is %d' % (scenario.name, result['requests'], scenario.max_requests))
+    #allow for the CPU time of the operation itself on top of the simulated latency
+    if result['serial'] is not None and result['serial'] > scenario.max_serial * SERIAL_TOLERANCE + 2:
+        failures.append('%s waited on %.1f serial round trips, budget is %d' % (scenario.name, result['serial'], scenario.max_serial))
+    return failures
+
+def run(latency=0.02, keyword=None):
+    '''
+    Runs the scenarios matching `keyword`. Returns the results and the list
+    of failure messages.
+    '''
+    results, failures = [], []
+    print('%-26s %9s %9s %9s %10s' % ('scenario', 'requests', 'serial', 'seconds', 'peak KiB'))
+    for scenario in SCENARIOS:
+        if keyword and keyword not in scenario.name:
+            continue
+        result = measure(scenario, latency)
+        results.append(result)
+        serial = '%.1f' % result['serial'] if result['serial'] is not None else '-'
+        print('%-26s %4d/%-4d %9s %9.3f %10.1f' % (scenario.name, result['requests'], scenario.max_requests,
+                                                  serial, result['seconds'], result['peak_kb']))
+        failures.extend(check(scenario, result))
+    return results, failures
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--latency', type=float, default=0.02, help='simulated seconds per request')
+    parser.add_argument('-k', dest='keyword', help='only run scenarios whose name contains this string')
+    parser.add_argument('--json', dest='json_path', help='write the measurements to this file')
+    args = parser.parse_args()
+    results, failures = run(args.latency, args.keyword)
+    if args.json_path:
+        with open(args.json_path, 'w') as f:
+            json.dump(results, f, indent=2)
+    for failure in failures:
+        print('FAIL: ' + failure)
+    return 1 if failures else 0
+
+if __name__ == '__main__':
+    sys.exit(main())